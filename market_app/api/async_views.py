@@ -0,0 +1,150 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView, exception_handler
+from market_app.instrumentation import span
+from market_app.models import Market, Product, Seller
+from .fast import FastMarketSerializer, FastProductSerializer, FastSellerSerializer
+from .filters import KeysetOrderingFilter
+from .mixins import parse_list_param
+from .pagination import KeysetPagination, get_keyset_ordering
+from .renderers import ORJSONRenderer
+from .views import MarketView, ProductView, SellerView
+
+
+class AsyncReadView(View):
+    http_method_names = ["get", "head", "options"]
+    model = None
+    fast_serializer_class = None
+    renderer_class = ORJSONRenderer
+    replica_reads = True
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+
+    get_authenticators = APIView.get_authenticators
+    get_permissions = APIView.get_permissions
+    get_throttles = APIView.get_throttles
+    get_authenticate_header = APIView.get_authenticate_header
+    perform_authentication = APIView.perform_authentication
+    check_permissions = APIView.check_permissions
+    check_throttles = APIView.check_throttles
+    permission_denied = APIView.permission_denied
+    throttled = APIView.throttled
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.query_request = Request(request, authenticators=self.get_authenticators())
+        try:
+            await sync_to_async(self.initial)(self.query_request)
+            return await super().dispatch(request, *args, **kwargs)
+        except (APIException, Http404) as exc:
+            return self.handle_exception(exc)
+
+    def initial(self, request):
+        self.perform_authentication(request)
+        self.check_permissions(request)
+        self.check_throttles(request)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            auth_header = self.get_authenticate_header(self.query_request)
+            if auth_header:
+                exc.auth_header = auth_header
+            else:
+                exc.status_code = status.HTTP_403_FORBIDDEN
+        response = exception_handler(exc, {"request": self.query_request, "view": self})
+        rendered = self.render(response.data, response.status_code)
+        for header, value in response.items():
+            if header != "Content-Type":
+                rendered[header] = value
+        return rendered
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def get_fieldset(self):
+        params = self.query_request.query_params
+        return {"fields": parse_list_param(params.get("fields")), "expand": parse_list_param(params.get("expand"))}
+
+    def get_fast_serializer(self, **kwargs):
+        return self.fast_serializer_class(**self.get_fieldset(), **kwargs)
+
+    def render(self, data, status=200):
+        with span("serialize"):
+            content = self.renderer_class().render(data)
+        return HttpResponse(content, status=status, content_type=self.renderer_class.media_type)
+
+
+class AsyncListView(AsyncReadView):
+    pagination_class = KeysetPagination
+    filter_backends = [KeysetOrderingFilter]
+    keyset_orderings = KeysetPagination.default_orderings
+
+    def filter_queryset(self, queryset):
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.query_request, queryset, self)
+        return queryset
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_fast_serializer(using=queryset.db)
+        extra = ()
+        if KeysetPagination.ordering_query_param in request.GET:
+            extra = [field.lstrip("-") for field in get_keyset_ordering(self.query_request, self)]
+        rows = serializer.values(queryset, extra)
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(rows, self.query_request, self)
+        if page is not None:
+            return self.render({"next": paginator.get_next_link(), "results": await serializer.arender(page)})
+        return self.render(await serializer.arender([row async for row in rows.aiterator()]))
+
+
+class AsyncDetailView(AsyncReadView):
+    async def get(self, request, pk, *args, **kwargs):
+        queryset = self.get_queryset()
+        serializer = self.get_fast_serializer(using=queryset.db)
+        try:
+            row = await serializer.values(queryset.filter(pk=pk)).aget()
+        except self.model.DoesNotExist:
+            raise Http404(f"No {self.model._meta.object_name} matches the given query.")
+        data = await serializer.arender([row])
+        return self.render(data[0])
+
+
+class AsyncMarketView(AsyncListView):
+    model = Market
+    fast_serializer_class = FastMarketSerializer
+    keyset_orderings = MarketView.keyset_orderings
+
+
+class AsyncMarketDetailView(AsyncDetailView):
+    model = Market
+    fast_serializer_class = FastMarketSerializer
+
+
+class AsyncSellerView(AsyncListView):
+    model = Seller
+    fast_serializer_class = FastSellerSerializer
+    filter_backends = SellerView.filter_backends
+    keyset_orderings = SellerView.keyset_orderings
+
+
+class AsyncSellerDetailView(AsyncDetailView):
+    model = Seller
+    fast_serializer_class = FastSellerSerializer
+
+
+class AsyncProductView(AsyncListView):
+    model = Product
+    fast_serializer_class = FastProductSerializer
+    filter_backends = ProductView.filter_backends
+    keyset_orderings = ProductView.keyset_orderings
+
+
+class AsyncProductDetailView(AsyncDetailView):
+    model = Product
+    fast_serializer_class = FastProductSerializer
@@ -0,0 +1,238 @@
+from functools import cache
+
+from django.db import connections
+from market_app.models import Market, Product, Seller
+
+
+@cache
+def serializer_field(serializer_class, name):
+    return serializer_class().fields[name]
+
+
+def chunked(ids, using):
+    size = connections[using].features.max_query_params or 10000
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def nested_expand(expand, name):
+    if expand is None:
+        return None
+    return [item[len(name) + 1 :] for item in expand if item.startswith(f"{name}.")]
+
+
+class MarketPool:
+    def __init__(self, using):
+        self.using = using
+        self.pending = set()
+        self.markets = {}
+
+    def add(self, ids):
+        self.pending.update(ids)
+
+    def load(self):
+        pending = self.pending - self.markets.keys()
+        if pending:
+            serializer = FastMarketSerializer(using=self.using)
+            self.store(serializer, serializer.fetch(sorted(pending)))
+
+    async def aload(self):
+        pending = self.pending - self.markets.keys()
+        if pending:
+            serializer = FastMarketSerializer(using=self.using)
+            self.store(serializer, await serializer.afetch(sorted(pending)))
+
+    def store(self, serializer, rows):
+        self.markets.update(zip((row["id"] for row in rows), serializer.build(rows, self)))
+        self.pending = set()
+
+    def __getitem__(self, pk):
+        return self.markets[pk]
+
+
+class FastSerializer:
+    model = None
+    fields = ()
+    columns = {}
+    relations = ()
+
+    def __init__(self, fields=None, expand=None, using="default"):
+        self.expand = expand
+        self.using = using
+        self.output = [name for name in self.fields if fields is None or name in fields]
+
+    def wanted(self, name):
+        return name in self.output
+
+    def expanded(self, name):
+        return self.expand is None or name in self.expand
+
+    def get_columns(self, extra=()):
+        columns = {"id"}
+        columns.update(self.columns.get(name, name) for name in self.output if name not in self.relations)
+        columns.update(self.columns[name] for name in self.relations if self.wanted(name) and name in self.columns)
+        columns.update(extra)
+        return sorted(columns)
+
+    def values(self, queryset, extra=()):
+        return queryset.values(*self.get_columns(extra))
+
+    def fetch(self, ids):
+        rows = []
+        for chunk in chunked(ids, self.using):
+            rows.extend(self.values(self.model.objects.using(self.using).filter(pk__in=chunk)))
+        return rows
+
+    async def afetch(self, ids):
+        rows = []
+        for chunk in chunked(ids, self.using):
+            rows.extend([row async for row in self.values(self.model.objects.using(self.using).filter(pk__in=chunk))])
+        return rows
+
+    def render(self, rows):
+        pool = MarketPool(self.using)
+        self.prepare(rows, pool)
+        pool.load()
+        return self.build(rows, pool)
+
+    async def arender(self, rows):
+        pool = MarketPool(self.using)
+        await self.aprepare(rows, pool)
+        await pool.aload()
+        return self.build(rows, pool)
+
+    def prepare(self, rows, pool):
+        pass
+
+    async def aprepare(self, rows, pool):
+        pass
+
+    def build(self, rows, pool):
+        raise NotImplementedError
+
+    def market_link_querysets(self, rows):
+        self.market_ids = {}
+        if not self.wanted("markets"):
+            return []
+        through = self.model.markets.through
+        column = f"{self.model._meta.model_name}_id"
+        ids = [row["id"] for row in rows]
+        self.market_ids = {pk: [] for pk in ids}
+        return [
+            through.objects.using(self.using)
+            .filter(**{f"{column}__in": chunk})
+            .order_by("market_id")
+            .values_list(column, "market_id")
+            for chunk in chunked(ids, self.using)
+        ]
+
+    def add_market_links(self, links, pool):
+        for owner_id, market_id in links:
+            self.market_ids[owner_id].append(market_id)
+            if self.expanded("markets"):
+                pool.add((market_id,))
+
+    def prepare_markets(self, rows, pool):
+        for queryset in self.market_link_querysets(rows):
+            self.add_market_links(queryset, pool)
+
+    async def aprepare_markets(self, rows, pool):
+        for queryset in self.market_link_querysets(rows):
+            self.add_market_links([link async for link in queryset], pool)
+
+    def build_markets(self, pk, pool):
+        if self.expanded("markets"):
+            return [pool[market_id] for market_id in self.market_ids[pk]]
+        return self.market_ids[pk]
+
+
+class FastMarketSerializer(FastSerializer):
+    model = Market
+    fields = ("id", "name", "location", "description", "net_worth")
+
+    def build(self, rows, pool):
+        from .serializers import MarketSerializer
+
+        net_worth = serializer_field(MarketSerializer, "net_worth").to_representation
+        return [
+            {name: net_worth(row[name]) if name == "net_worth" else row[name] for name in self.output} for row in rows
+        ]
+
+
+class FastSellerSerializer(FastSerializer):
+    model = Seller
+    fields = ("id", "name", "contact_info", "market_count", "markets")
+    relations = ("markets",)
+
+    def prepare(self, rows, pool):
+        self.prepare_markets(rows, pool)
+
+    async def aprepare(self, rows, pool):
+        await self.aprepare_markets(rows, pool)
+
+    def build(self, rows, pool):
+        return [
+            {name: self.build_markets(row["id"], pool) if name == "markets" else row[name] for name in self.output}
+            for row in rows
+        ]
+
+
+class FastProductSerializer(FastSerializer):
+    model = Product
+    fields = ("id", "name", "price", "description", "market_count", "markets", "seller")
+    columns = {"seller": "seller_id"}
+    relations = ("markets", "seller")
+
+    def __init__(self, fields=None, expand=None, using="default"):
+        super().__init__(fields, expand, using)
+        self.seller_serializer = None
+        if self.wanted("seller") and self.expanded("seller"):
+            self.seller_serializer = FastSellerSerializer(expand=nested_expand(expand, "seller"), using=using)
+
+    def get_columns(self, extra=()):
+        columns = super().get_columns(extra)
+        if self.seller_serializer is not None:
+            columns += [f"seller__{column}" for column in self.seller_serializer.get_columns() if column != "id"]
+        return columns
+
+    def prepare(self, rows, pool):
+        self.prepare_markets(rows, pool)
+        if self.collect_sellers(rows):
+            self.seller_serializer.prepare(list(self.seller_rows.values()), pool)
+
+    async def aprepare(self, rows, pool):
+        await self.aprepare_markets(rows, pool)
+        if self.collect_sellers(rows):
+            await self.seller_serializer.aprepare(list(self.seller_rows.values()), pool)
+
+    def collect_sellers(self, rows):
+        self.seller_rows = {}
+        if self.seller_serializer is None:
+            return False
+        prefix = len("seller__")
+        for row in rows:
+            if row["seller_id"] is not None and row["seller_id"] not in self.seller_rows:
+                seller = {key[prefix:]: value for key, value in row.items() if key.startswith("seller__")}
+                self.seller_rows[row["seller_id"]] = {**seller, "id": row["seller_id"]}
+        return True
+
+    def build(self, rows, pool):
+        from .serializers import ProductSerializer
+
+        price = serializer_field(ProductSerializer, "price").to_representation
+        sellers = {}
+        if self.seller_serializer is not None:
+            seller_rows = list(self.seller_rows.values())
+            sellers = dict(zip(self.seller_rows, self.seller_serializer.build(seller_rows, pool)))
+
+        def value(row, name):
+            if name == "price":
+                return price(row["price"])
+            if name == "markets":
+                return self.build_markets(row["id"], pool)
+            if name == "seller":
+                return sellers.get(row["seller_id"]) if self.seller_serializer is not None else row["seller_id"]
+            return row[name]
+
+        return [{name: value(row, name) for name in self.output} for row in rows]
@@ -0,0 +1,54 @@
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+from market_app.search import search_products
+from .pagination import KeysetPagination, get_keyset_ordering
+
+
+class KeysetOrderingFilter(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        if KeysetPagination.ordering_query_param not in request.query_params:
+            return queryset
+        return queryset.order_by(*get_keyset_ordering(request, view))
+
+
+class MarketCountFilterSerializer(serializers.Serializer):
+    min_market_count = serializers.IntegerField(min_value=0, required=False)
+    max_market_count = serializers.IntegerField(min_value=0, required=False)
+
+
+class MarketCountFilterBackend(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        params = MarketCountFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+        if "min_market_count" in filters:
+            queryset = queryset.filter(market_count__gte=filters["min_market_count"])
+        if "max_market_count" in filters:
+            queryset = queryset.filter(market_count__lte=filters["max_market_count"])
+        return queryset
+
+
+class ProductFilterSerializer(serializers.Serializer):
+    min_price = serializers.DecimalField(max_digits=50, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=50, decimal_places=2, required=False)
+    seller_id = serializers.IntegerField(required=False)
+    market_id = serializers.IntegerField(required=False)
+    search = serializers.CharField(required=False)
+
+
+class ProductFilterBackend(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        params = ProductFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+        if "min_price" in filters:
+            queryset = queryset.filter(price__gte=filters["min_price"])
+        if "max_price" in filters:
+            queryset = queryset.filter(price__lte=filters["max_price"])
+        if "seller_id" in filters:
+            queryset = queryset.filter(seller_id=filters["seller_id"])
+        if "market_id" in filters:
+            queryset = queryset.filter(markets=filters["market_id"])
+        if "search" in filters:
+            queryset = search_products(queryset, filters["search"])
+        return queryset
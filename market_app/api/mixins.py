@@ -1,3 +1,214 @@
+import hashlib
+from datetime import datetime
+
+from django.core.cache import cache as django_cache
+from django.db.models import Count, Max
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import serializers
+from rest_framework.response import Response
+from market_app import cache, documents
+from market_app.instrumentation import span
+from .pagination import get_keyset_ordering
+
+
 class MarketCountMixin:
     def get_market_count(self, obj):
-        return obj.markets.count()
+        return obj.market_count
+
+
+def parse_list_param(value):
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class DynamicFieldsMixin:
+    expandable_fields = {}
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if expand is not None:
+            for name, (serializer_class, options) in self.expandable_fields.items():
+                if name not in self.fields:
+                    continue
+                if name in expand:
+                    nested = [item[len(name) + 1 :] for item in expand if item.startswith(f"{name}.")]
+                    self.fields[name] = serializer_class(read_only=True, expand=nested, **options)
+                else:
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, **options)
+        if fields is not None:
+            for name in list(self.fields):
+                if name not in fields and not self.fields[name].write_only:
+                    self.fields.pop(name)
+
+
+class EagerLoadingMixin:
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        if self.request.method in ("GET", "HEAD") and hasattr(serializer_class, "setup_eager_loading"):
+            fieldset = self.get_fieldset()
+            if fieldset["fields"] is not None and "ordering" in self.request.query_params:
+                fieldset["fields"] += [field.lstrip("-") for field in get_keyset_ordering(self.request, self)]
+            queryset = serializer_class.setup_eager_loading(queryset, **fieldset)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method in ("GET", "HEAD") and issubclass(self.get_serializer_class(), DynamicFieldsMixin):
+            kwargs.update(self.get_fieldset())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_fieldset(self):
+        params = self.request.query_params
+        return {"fields": parse_list_param(params.get("fields")), "expand": parse_list_param(params.get("expand"))}
+
+
+class CachedRetrieveMixin:
+    def retrieve(self, request, *args, **kwargs):
+        if not cache.is_enabled():
+            return super().retrieve(request, *args, **kwargs)
+        self.check_object_permissions(request, self.get_permission_object())
+        key = cache.response_cache_key(self.queryset.model, kwargs[self.lookup_field], request)
+        data = django_cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().retrieve(request, *args, **kwargs)
+        if getattr(request, "read_database", None) is None:
+            django_cache.set(key, response.data, cache.get_timeout())
+        return response
+
+    def get_permission_object(self):
+        queryset = self.filter_queryset(self.get_queryset()).select_related(None).prefetch_related(None)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+
+
+class ConditionalGetMixin:
+    conditional_models = ()
+    conditional_lookups = ("updated_at",)
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+        etag, last_modified = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def get_validators(self):
+        if self.lookup_field in self.kwargs:
+            values = self.get_object_aggregate()
+        else:
+            values = self.get_list_aggregate()
+        timestamps = [value for value in values if isinstance(value, datetime)]
+        if not timestamps:
+            return None
+        query = sorted(self.request.query_params.lists())
+        state = repr((self.request.accepted_media_type, sorted(self.kwargs.items()), query, values)).encode()
+        etag = f'W/"{hashlib.md5(state).hexdigest()}"'
+        return etag, int(max(timestamps).timestamp())
+
+    def get_object_aggregate(self):
+        queryset = self.queryset.model.objects.filter(pk=self.kwargs[self.lookup_field])
+        aggregates = {f"max_{lookup}": Max(lookup) for lookup in self.conditional_lookups}
+        for lookup in self.conditional_lookups:
+            if "__" in lookup:
+                relation = lookup.rsplit("__", 1)[0]
+                aggregates[f"count_{relation}"] = Count(relation, distinct=True)
+        return tuple(queryset.aggregate(**aggregates).values())
+
+    def get_list_aggregate(self):
+        values = ()
+        for model in self.conditional_models:
+            values += tuple(model.objects.aggregate(Max("updated_at"), Count("pk")).values())
+        return values
+
+
+class SerializationTimingMixin:
+    def list(self, request, *args, **kwargs):
+        with span("serialize"):
+            return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        with span("serialize"):
+            return super().retrieve(request, *args, **kwargs)
+
+
+class FastListMixin:
+    fast_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        serializer = self.get_fast_serializer(using=queryset.db)
+        extra = ()
+        if "ordering" in request.query_params:
+            extra = [field.lstrip("-") for field in get_keyset_ordering(request, self)]
+        rows = serializer.values(queryset, extra)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.render(page))
+        return Response(serializer.render(list(rows)))
+
+    def get_fast_serializer(self, **kwargs):
+        return self.fast_serializer_class(**self.get_fieldset(), **kwargs)
+
+
+class ReadModelMixin:
+    def use_read_model(self):
+        fieldset = self.get_fieldset()
+        return documents.is_enabled() and fieldset["fields"] is None and fieldset["expand"] is None
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_read_model():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        extra = ()
+        if "ordering" in request.query_params:
+            extra = [field.lstrip("-") for field in get_keyset_ordering(request, self)]
+        rows = queryset.values("id", "document__body", *extra)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.load_documents(page, queryset.db))
+        return Response(self.load_documents(list(rows), queryset.db))
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.use_read_model():
+            queryset = self.queryset.model.objects.filter(pk=kwargs[self.lookup_field])
+            body = queryset.values_list("document__body", flat=True).first()
+            if body is not None:
+                return Response(documents.loads(body))
+        return super().retrieve(request, *args, **kwargs)
+
+    def load_documents(self, rows, using):
+        missing = [row["id"] for row in rows if row["document__body"] is None]
+        rendered = {}
+        if missing:
+            serializer = self.get_fast_serializer(using=using)
+            rendered = {item["id"]: item for item in serializer.render(serializer.fetch(missing))}
+        return [
+            rendered[row["id"]] if row["document__body"] is None else documents.loads(row["document__body"])
+            for row in rows
+        ]
+
+
+class NestedListMixin:
+    parent_model = None
+    parent_field = None
+    parent_url_kwarg = None
+    http_method_names = ["get", "head", "options"]
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**{self.parent_field: self.kwargs[self.parent_url_kwarg]})
+
+    def get(self, request, *args, **kwargs):
+        if not self.parent_model.objects.filter(pk=kwargs[self.parent_url_kwarg]).exists():
+            raise Http404(f"No {self.parent_model._meta.object_name} matches the given query.")
+        return super().get(request, *args, **kwargs)
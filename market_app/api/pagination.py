@@ -0,0 +1,122 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def get_keyset_ordering(request, view):
+    orderings = getattr(view, "keyset_orderings", KeysetPagination.default_orderings)
+    key = request.query_params.get(KeysetPagination.ordering_query_param, "id")
+    descending = key.startswith("-")
+    fields = orderings.get(key.lstrip("-"))
+    if fields is None:
+        raise ValidationError({KeysetPagination.ordering_query_param: [KeysetPagination.invalid_ordering_message]})
+    if descending:
+        return tuple(f"-{field}" for field in fields)
+    return tuple(fields)
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    ordering_query_param = "ordering"
+    page_size = 100
+    max_page_size = 1000
+    default_orderings = {"id": ("id",)}
+    invalid_cursor_message = "Invalid cursor"
+    invalid_ordering_message = "Invalid ordering"
+    invalid_page_size_message = "A positive integer is required"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, view)
+        self.model = queryset.model
+
+        queryset = queryset.order_by(*self.ordering)
+        values = self.decode_cursor(request)
+        if values is not None:
+            queryset = queryset.filter(self.keyset_filter(values))
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_page_size(self, request):
+        if self.page_size_query_param not in request.query_params:
+            return self.page_size
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+            )
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: [self.invalid_page_size_message]})
+
+    def get_ordering(self, request, view):
+        return get_keyset_ordering(request, view)
+
+    def keyset_filter(self, values):
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            step = Q(**{f"{field.lstrip('-')}__{lookup}": values[index]})
+            for previous, value in zip(self.ordering[:index], values):
+                step &= Q(**{previous.lstrip("-"): value})
+            condition |= step
+        return condition
+
+    def get_cursor_values(self, row):
+        if isinstance(row, dict):
+            return [row[field.lstrip("-")] for field in self.ordering]
+        return [getattr(row, field.lstrip("-")) for field in self.ordering]
+
+    def encode_cursor(self, values):
+        payload = json.dumps([str(value) for value in values]).encode()
+        return urlsafe_b64encode(payload).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = json.loads(urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+            if not isinstance(raw, list) or len(raw) != len(self.ordering):
+                raise ValueError
+            fields = [self.model._meta.get_field(field.lstrip("-")) for field in self.ordering]
+            return [field.to_python(value) for field, value in zip(fields, raw)]
+        except (TypeError, ValueError, DjangoValidationError):
+            raise ValidationError({self.cursor_query_param: [self.invalid_cursor_message]})
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        cursor = self.encode_cursor(self.get_cursor_values(self.page[-1]))
+        return replace_query_param(url, self.cursor_query_param, cursor)
@@ -1,12 +1,99 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Prefetch
 from rest_framework import serializers
-from market_app.models import Market, Seller, Product
-from .mixins import MarketCountMixin
+from rest_framework.relations import MANY_RELATION_KWARGS
+from market_app.models import Job, Market, Seller, Product
+from .mixins import DynamicFieldsMixin, MarketCountMixin
 
 
-class MarketSerializer(serializers.ModelSerializer):
+def get_lookup_cache(context, queryset):
+    request = context.get("request")
+    if request is not None:
+        caches = getattr(request, "_pk_lookup_cache", None)
+        if caches is None:
+            caches = request._pk_lookup_cache = {}
+    else:
+        caches = context.setdefault("pk_lookup_cache", {})
+    return caches.setdefault((queryset.model._meta.label, str(queryset.query)), {})
+
+
+def prime_lookup_cache(context, queryset, pks):
+    lookup = get_lookup_cache(context, queryset)
+    pending = {pk for pk in pks if pk not in lookup}
+    if pending:
+        lookup.update(dict.fromkeys(pending))
+        lookup.update(queryset.in_bulk(pending))
+    return lookup
+
+
+def prime_batched_fields(list_serializer):
+    for field in list_serializer.child.fields.values():
+        relation = getattr(field, "child_relation", field)
+        if field.read_only or not isinstance(relation, BatchedPrimaryKeyRelatedField):
+            continue
+        pks = set()
+        for item in list_serializer.initial_data:
+            value = item.get(field.field_name) if isinstance(item, dict) else None
+            for raw in value if isinstance(value, list) else [value]:
+                try:
+                    pks.add(relation.to_pk(raw))
+                except serializers.ValidationError:
+                    pass
+        pks.discard(None)
+        prime_lookup_cache(relation.context, relation.get_queryset(), pks)
+
+
+class BatchedManyRelatedField(serializers.ManyRelatedField):
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+        return self.child_relation.to_internal_value_many(data)
+
+
+class BatchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchedManyRelatedField(**list_kwargs)
+
+    def to_internal_value(self, data):
+        return self.to_internal_value_many([data])[0]
+
+    def to_internal_value_many(self, data):
+        pks = [self.to_pk(item) for item in data]
+        lookup = prime_lookup_cache(self.context, self.get_queryset(), pks)
+        missing = [pk for pk in dict.fromkeys(pks) if lookup[pk] is None]
+        if missing:
+            raise serializers.ValidationError(
+                [self.error_messages["does_not_exist"].format(pk_value=pk) for pk in missing], code="does_not_exist"
+            )
+        return [lookup[pk] for pk in pks]
+
+    def to_pk(self, data):
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
+def market_queryset(expanded):
+    queryset = Market.objects.order_by("pk")
+    return queryset if expanded else queryset.only("id")
+
+
+class MarketSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Market
-        fields = "__all__"
+        exclude = ["external_id", "updated_at"]
 
     def validate_net_worth(self, value):
         if value < 0:
@@ -14,9 +101,9 @@ class MarketSerializer(serializers.ModelSerializer):
         return value
 
 
-class SellerSerializer(serializers.ModelSerializer, MarketCountMixin):
+class SellerSerializer(DynamicFieldsMixin, serializers.ModelSerializer, MarketCountMixin):
     markets = MarketSerializer(many=True, read_only=True)
-    markets_ids = serializers.PrimaryKeyRelatedField(
+    markets_ids = BatchedPrimaryKeyRelatedField(
         source="markets", queryset=Market.objects.all(), many=True, write_only=True
     )
     market_count = serializers.SerializerMethodField()
@@ -25,21 +112,129 @@ class SellerSerializer(serializers.ModelSerializer, MarketCountMixin):
         model = Seller
         fields = ["id", "name", "contact_info", "market_count", "markets", "markets_ids"]
 
+    expandable_fields = {"markets": (MarketSerializer, {"many": True})}
+    deferrable_fields = ("name", "contact_info", "market_count")
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None, expand=None):
+        if fields is None or "markets" in fields:
+            expanded = expand is None or "markets" in expand
+            queryset = queryset.prefetch_related(Prefetch("markets", queryset=market_queryset(expanded)))
+        if fields is not None:
+            queryset = queryset.defer(*[name for name in cls.deferrable_fields if name not in fields])
+        return queryset
 
-class ProductSerializer(serializers.ModelSerializer, MarketCountMixin):
+
+class ProductSerializer(DynamicFieldsMixin, serializers.ModelSerializer, MarketCountMixin):
     markets = MarketSerializer(many=True, read_only=True)
-    markets_ids = serializers.PrimaryKeyRelatedField(
+    markets_ids = BatchedPrimaryKeyRelatedField(
         source="markets", queryset=Market.objects.all(), many=True, write_only=True
     )
     seller = SellerSerializer(read_only=True)
-    seller_id = serializers.PrimaryKeyRelatedField(source="seller", queryset=Seller.objects.all(), write_only=True)
+    seller_id = BatchedPrimaryKeyRelatedField(source="seller", queryset=Seller.objects.all(), write_only=True)
     market_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = ["id", "name", "price", "description", "market_count", "markets", "markets_ids", "seller", "seller_id"]
 
+    expandable_fields = {"markets": (MarketSerializer, {"many": True}), "seller": (SellerSerializer, {})}
+    deferrable_fields = ("name", "price", "description", "market_count")
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None, expand=None):
+        def wanted(name):
+            return fields is None or name in fields
+
+        def expanded(name):
+            return expand is None or name in expand
+
+        lookups = []
+        if wanted("seller") and expanded("seller"):
+            queryset = queryset.select_related("seller")
+            lookups.append(Prefetch("seller__markets", queryset=market_queryset(expanded("seller.markets"))))
+        if wanted("markets"):
+            lookups.append(Prefetch("markets", queryset=market_queryset(expanded("markets"))))
+        if fields is not None:
+            queryset = queryset.defer(*[name for name in cls.deferrable_fields if name not in fields])
+        return queryset.prefetch_related(*lookups)
+
     def validate_price(self, value):
         if value < 0:
             raise serializers.ValidationError("Price cannot be negative.")
         return value
+
+
+class ProductBulkSerializer(ProductSerializer):
+    class Meta:
+        model = Product
+        fields = ["name", "price", "description", "markets_ids", "seller_id"]
+
+
+class ProductBulkUpdateSerializer(ProductBulkSerializer):
+    id = serializers.IntegerField()
+
+    class Meta:
+        model = Product
+        fields = ["id", "name", "price", "description", "markets_ids", "seller_id"]
+
+    def validate(self, attrs):
+        if "id" not in attrs:
+            raise serializers.ValidationError({"id": "This field is required."})
+        return attrs
+
+
+class MarketMembershipSerializer(serializers.Serializer):
+    add = BatchedPrimaryKeyRelatedField(queryset=Market.objects.only("id"), many=True, required=False)
+    remove = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, attrs):
+        add = {market.pk for market in attrs.get("add", [])}
+        remove = set(attrs.get("remove", []))
+        if not add and not remove:
+            raise serializers.ValidationError("Provide markets to add or remove.")
+        if add & remove:
+            raise serializers.ValidationError(
+                {"remove": [f"Market {pk} cannot be added and removed at once." for pk in sorted(add & remove)]}
+            )
+        return {"add": add, "remove": remove}
+
+
+class MarketStatsSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    net_worth = serializers.DecimalField(max_digits=100, decimal_places=2)
+    product_count = serializers.IntegerField()
+    seller_count = serializers.IntegerField()
+    min_price = serializers.DecimalField(max_digits=50, decimal_places=2, allow_null=True)
+    avg_price = serializers.DecimalField(max_digits=50, decimal_places=2, allow_null=True)
+    max_price = serializers.DecimalField(max_digits=50, decimal_places=2, allow_null=True)
+    total_value = serializers.DecimalField(max_digits=100, decimal_places=2)
+    net_worth_share = serializers.SerializerMethodField()
+
+    def get_net_worth_share(self, row):
+        if not row["net_worth"]:
+            return None
+        return round(float(row["total_value"] / row["net_worth"]), 6)
+
+
+class MarketRepriceSerializer(serializers.Serializer):
+    percent = serializers.DecimalField(max_digits=7, decimal_places=2, min_value=-99, max_value=1000)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "payload",
+            "result",
+            "error",
+            "attempts",
+            "progress",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
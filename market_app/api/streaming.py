@@ -0,0 +1,40 @@
+from itertools import islice
+
+from rest_framework.renderers import BaseRenderer
+
+from .renderers import ORJSONRenderer
+
+
+def dumps(data):
+    return ORJSONRenderer().render(data)
+
+
+def iter_chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def stream_json_array(items):
+    yield b"["
+    separator = b""
+    for item in items:
+        yield separator + dumps(item)
+        separator = b","
+    yield b"]"
+
+
+def stream_ndjson(items):
+    for item in items:
+        yield dumps(item) + b"\n"
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return dumps(data) + b"\n"
@@ -1,11 +1,31 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path("markets/", views.MarketView.as_view(), name="home"),
+    path("markets/stats/", views.MarketStatsView.as_view(), name="market_stats"),
     path("markets/<int:pk>/", views.MarketDetailView.as_view(), name="market_detail"),
+    path("markets/<int:pk>/reprice/", views.MarketRepriceView.as_view(), name="market_reprice"),
+    path("markets/<int:pk>/stats/", views.MarketStatsView.as_view(), name="market_stats_detail"),
+    path("markets/<int:market_pk>/products/", views.MarketProductsView.as_view(), name="market_products"),
+    path("markets/<int:market_pk>/sellers/", views.MarketSellersView.as_view(), name="market_sellers"),
     path("sellers/", views.SellerView.as_view(), name="sellers"),
     path("sellers/<int:pk>/", views.SellerDetailView.as_view(), name="seller_detail"),
+    path("sellers/<int:pk>/markets/", views.SellerMarketsView.as_view(), name="seller_markets"),
+    path("sellers/<int:seller_pk>/products/", views.SellerProductsView.as_view(), name="seller_products"),
     path("products/", views.ProductView.as_view(), name="products"),
+    path("products/bulk/", views.ProductBulkView.as_view(), name="product_bulk"),
+    path("products/export/", views.ProductExportView.as_view(), name="product_export"),
     path("products/<int:pk>/", views.ProductDetailView.as_view(), name="product_detail"),
+    path("products/<int:pk>/markets/", views.ProductMarketsView.as_view(), name="product_markets"),
+    path("changes/", views.ChangeFeedView.as_view(), name="changes"),
+    path("jobs/", views.JobView.as_view(), name="jobs"),
+    path("jobs/<int:pk>/", views.JobDetailView.as_view(), name="job_detail"),
+    path("metrics/", views.MetricsView.as_view(), name="metrics"),
+    path("async/markets/", async_views.AsyncMarketView.as_view(), name="async_markets"),
+    path("async/markets/<int:pk>/", async_views.AsyncMarketDetailView.as_view(), name="async_market_detail"),
+    path("async/sellers/", async_views.AsyncSellerView.as_view(), name="async_sellers"),
+    path("async/sellers/<int:pk>/", async_views.AsyncSellerDetailView.as_view(), name="async_seller_detail"),
+    path("async/products/", async_views.AsyncProductView.as_view(), name="async_products"),
+    path("async/products/<int:pk>/", async_views.AsyncProductDetailView.as_view(), name="async_product_detail"),
 ]
@@ -1,33 +1,401 @@
-from rest_framework import generics
-from .serializers import MarketSerializer, SellerSerializer, ProductSerializer
-from market_app.models import Market, Seller, Product
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import generics, serializers, status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .filters import KeysetOrderingFilter, MarketCountFilterBackend, ProductFilterBackend
+from .fast import FastMarketSerializer, FastProductSerializer, FastSellerSerializer
+from .mixins import (
+    CachedRetrieveMixin,
+    ConditionalGetMixin,
+    EagerLoadingMixin,
+    FastListMixin,
+    NestedListMixin,
+    ReadModelMixin,
+    SerializationTimingMixin,
+)
+from .pagination import KeysetPagination
+from .renderers import ORJSONRenderer
+from .streaming import NDJSONRenderer, iter_chunks, stream_json_array, stream_ndjson
+from .serializers import (
+    MarketSerializer,
+    SellerSerializer,
+    ProductSerializer,
+    ProductBulkSerializer,
+    ProductBulkUpdateSerializer,
+    MarketStatsSerializer,
+    MarketMembershipSerializer,
+    MarketRepriceSerializer,
+    JobSerializer,
+    prime_batched_fields,
+)
+from market_app import changes, instrumentation, jobs, stats
+from market_app.models import Job, Market, Seller, Product
+from market_app.signals import bulk_changed, member_market_pks
 
 
-class MarketView(generics.ListCreateAPIView):
+def job_accepted(job, request, headers=None):
+    location = reverse("job_detail", args=[job.pk])
+    data = JobSerializer(job, context={"request": request}).data
+    return Response(data, status=status.HTTP_202_ACCEPTED, headers={"Location": location, **(headers or {})})
+
+
+def prefers_async(request):
+    return "respond-async" in request.headers.get("Prefer", "")
+
+
+class MarketView(
+    ConditionalGetMixin, EagerLoadingMixin, SerializationTimingMixin, FastListMixin, generics.ListCreateAPIView
+):
     queryset = Market.objects.all()
     serializer_class = MarketSerializer
+    replica_reads = True
+    fast_serializer_class = FastMarketSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [KeysetOrderingFilter]
+    keyset_orderings = {"id": ("id",), "name": ("name", "id")}
+    conditional_models = (Market,)
 
 
-class MarketDetailView(generics.RetrieveUpdateDestroyAPIView):
+class MarketDetailView(
+    ConditionalGetMixin,
+    CachedRetrieveMixin,
+    EagerLoadingMixin,
+    SerializationTimingMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
     queryset = Market.objects.all()
     serializer_class = MarketSerializer
+    replica_reads = True
+
+
+class MarketStatsView(generics.GenericAPIView):
+    queryset = Market.objects.all()
+    serializer_class = MarketStatsSerializer
+    replica_reads = True
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        if "pk" in kwargs:
+            rows = stats.market_stats(queryset.filter(pk=kwargs["pk"]))
+            if not rows:
+                raise Http404("No Market matches the given query.")
+            return Response(self.get_serializer(rows[0]).data)
+        return Response(self.get_serializer(stats.market_stats(queryset), many=True).data)
 
 
-class SellerView(generics.ListCreateAPIView):
+class SellerView(
+    ConditionalGetMixin,
+    EagerLoadingMixin,
+    SerializationTimingMixin,
+    ReadModelMixin,
+    FastListMixin,
+    generics.ListCreateAPIView,
+):
     queryset = Seller.objects.all()
     serializer_class = SellerSerializer
+    replica_reads = True
+    fast_serializer_class = FastSellerSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [MarketCountFilterBackend, KeysetOrderingFilter]
+    keyset_orderings = {"id": ("id",), "name": ("name", "id"), "market_count": ("market_count", "id")}
+    conditional_models = (Seller, Market)
 
 
-class SellerDetailView(generics.RetrieveUpdateDestroyAPIView):
+class SellerDetailView(
+    ConditionalGetMixin,
+    CachedRetrieveMixin,
+    ReadModelMixin,
+    EagerLoadingMixin,
+    SerializationTimingMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
     queryset = Seller.objects.all()
     serializer_class = SellerSerializer
+    replica_reads = True
+    conditional_lookups = ("updated_at", "markets__updated_at")
 
+    def destroy(self, request, *args, **kwargs):
+        if not prefers_async(request):
+            return super().destroy(request, *args, **kwargs)
+        job = jobs.enqueue("delete_seller", seller_id=self.get_object().pk)
+        return job_accepted(job, request, {"Preference-Applied": "respond-async"})
 
-class ProductView(generics.ListCreateAPIView):
+
+class ProductView(
+    ConditionalGetMixin,
+    EagerLoadingMixin,
+    SerializationTimingMixin,
+    ReadModelMixin,
+    FastListMixin,
+    generics.ListCreateAPIView,
+):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    replica_reads = True
+    fast_serializer_class = FastProductSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [ProductFilterBackend, MarketCountFilterBackend, KeysetOrderingFilter]
+    keyset_orderings = {
+        "id": ("id",),
+        "name": ("name", "id"),
+        "price": ("price", "id"),
+        "market_count": ("market_count", "id"),
+    }
+    conditional_models = (Product, Seller, Market)
+
+
+class ProductDetailView(
+    ConditionalGetMixin,
+    CachedRetrieveMixin,
+    ReadModelMixin,
+    EagerLoadingMixin,
+    SerializationTimingMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
+    queryset = Product.objects.all()
+    serializer_class = ProductSerializer
+    replica_reads = True
+    conditional_lookups = (
+        "updated_at",
+        "seller__updated_at",
+        "markets__updated_at",
+        "seller__markets__updated_at",
+    )
+
+
+class MarketProductsView(NestedListMixin, ProductView):
+    parent_model = Market
+    parent_field = "markets"
+    parent_url_kwarg = "market_pk"
+
+
+class MarketSellersView(NestedListMixin, SellerView):
+    parent_model = Market
+    parent_field = "markets"
+    parent_url_kwarg = "market_pk"
+
+
+class SellerProductsView(NestedListMixin, ProductView):
+    parent_model = Seller
+    parent_field = "seller"
+    parent_url_kwarg = "seller_pk"
+
+
+class MarketMembershipView(generics.GenericAPIView):
+    serializer_class = MarketMembershipSerializer
+    http_method_names = ["post", "options"]
+
+    def post(self, request, *args, **kwargs):
+        model = self.queryset.model
+        pk = kwargs[self.lookup_field]
+        if not model.objects.filter(pk=pk).exists():
+            raise Http404(f"No {model._meta.object_name} matches the given query.")
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        add, remove = serializer.validated_data["add"], serializer.validated_data["remove"]
+
+        through = model.markets.through
+        column = f"{model._meta.model_name}_id"
+        with transaction.atomic():
+            if add:
+                through.objects.bulk_create(
+                    [through(**{column: pk, "market_id": market_pk}) for market_pk in sorted(add)],
+                    ignore_conflicts=True,
+                )
+            if remove:
+                through.objects.filter(**{column: pk, "market_id__in": remove}).delete()
+            model.objects.filter(pk=pk).update(updated_at=timezone.now())
+        bulk_changed.send(sender=model, pks={pk}, market_pks=add | remove)
+        market_count = model.objects.values_list("market_count", flat=True).get(pk=pk)
+        return Response({"id": pk, "market_count": market_count})
+
+
+class MarketRepriceView(generics.GenericAPIView):
+    queryset = Market.objects.all()
+    serializer_class = MarketRepriceSerializer
+
+    def post(self, request, *args, **kwargs):
+        market = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = jobs.enqueue("reprice_market", market_id=market.pk, percent=str(serializer.validated_data["percent"]))
+        return job_accepted(job, request)
+
+
+class SellerMarketsView(MarketMembershipView):
+    queryset = Seller.objects.all()
 
 
-class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ProductMarketsView(MarketMembershipView):
+    queryset = Product.objects.all()
+
+
+class ProductExportView(EagerLoadingMixin, FastListMixin, generics.GenericAPIView):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    fast_serializer_class = FastProductSerializer
+    renderer_classes = [ORJSONRenderer, NDJSONRenderer]
+    filter_backends = [ProductFilterBackend]
+    chunk_size = 500
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).order_by("pk")
+        serializer = self.get_fast_serializer(using=queryset.db)
+        rows = serializer.values(queryset).iterator(chunk_size=self.chunk_size)
+        items = (item for chunk in iter_chunks(rows, self.chunk_size) for item in serializer.render(chunk))
+        renderer = request.accepted_renderer
+        stream = stream_ndjson if renderer.format == "ndjson" else stream_json_array
+        return StreamingHttpResponse(stream(items), content_type=f"{renderer.media_type}; charset=utf-8")
+
+
+class ProductBulkView(generics.GenericAPIView):
+    queryset = Product.objects.all()
+    serializer_class = ProductBulkSerializer
+    does_not_exist_message = 'Invalid pk "{pk_value}" - object does not exist.'
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, many=True)
+        errors = self.validate_items(serializer)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            products = Product.objects.bulk_create(
+                [
+                    Product(**{key: value for key, value in item.items() if key != "markets"})
+                    for item in serializer.validated_data
+                ]
+            )
+            self.write_markets(
+                {product.pk: item["markets"] for product, item in zip(products, serializer.validated_data)}
+            )
+        bulk_changed.send(sender=Product, pks={product.pk for product in products})
+        return Response({"created": [product.pk for product in products]}, status=status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        serializer = ProductBulkUpdateSerializer(
+            data=request.data, many=True, partial=True, context=self.get_serializer_context()
+        )
+        errors = self.validate_items(serializer)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            products = Product.objects.in_bulk([item["id"] for item in serializer.validated_data])
+            fields = {"updated_at"}
+            markets = {}
+            now = timezone.now()
+            for item in serializer.validated_data:
+                product = products[item["id"]]
+                product.updated_at = now
+                for key, value in item.items():
+                    if key == "markets":
+                        markets[product.pk] = value
+                    elif key != "id":
+                        setattr(product, key, value)
+                        fields.add(key)
+            Product.objects.bulk_update(products.values(), sorted(fields))
+            market_pks = member_market_pks(Product, list(products))
+            Product.markets.through.objects.filter(product_id__in=markets).delete()
+            self.write_markets(markets)
+            market_pks |= member_market_pks(Product, list(products))
+        bulk_changed.send(sender=Product, pks=set(products), market_pks=market_pks)
+        return Response({"updated": sorted(products)})
+
+    def delete(self, request, *args, **kwargs):
+        ids = request.data.get("ids") if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            return Response({"ids": ["Expected a list of ids."]}, status=status.HTTP_400_BAD_REQUEST)
+        missing = set(ids) - set(Product.objects.filter(pk__in=ids).values_list("pk", flat=True))
+        if missing:
+            return Response(
+                {"ids": [self.does_not_exist_message.format(pk_value=pk) for pk in sorted(missing)]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        with transaction.atomic():
+            Product.objects.filter(pk__in=ids).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def validate_items(self, serializer):
+        if not isinstance(serializer.initial_data, list):
+            return {"non_field_errors": ["Expected a list of items."]}
+        prime_batched_fields(serializer)
+        if not serializer.is_valid():
+            return serializer.errors
+
+        items = serializer.validated_data
+        pks = {item["id"] for item in items if "id" in item}
+        existing = set(Product.objects.filter(pk__in=pks).values_list("pk", flat=True)) if pks else set()
+        errors = [
+            {"id": [self.does_not_exist_message.format(pk_value=item["id"])]}
+            if "id" in item and item["id"] not in existing
+            else {}
+            for item in items
+        ]
+        return errors if any(errors) else None
+
+    def write_markets(self, markets):
+        through = Product.markets.through
+        through.objects.bulk_create(
+            [
+                through(product_id=product_id, market_id=market.pk)
+                for product_id, product_markets in markets.items()
+                for market in dict.fromkeys(product_markets)
+            ]
+        )
+
+
+class JobView(generics.ListAPIView):
+    queryset = Job.objects.order_by("pk")
+    serializer_class = JobSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [KeysetOrderingFilter]
+    keyset_orderings = {"id": ("id",)}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        job_status = self.request.query_params.get("status")
+        return queryset.filter(status=job_status) if job_status else queryset
+
+
+class JobDetailView(generics.RetrieveAPIView):
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+
+
+class ChangeFeedQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+
+
+class ChangeFeedView(APIView):
+    pruned_message = "Changes before this sequence have been pruned; resync from the full lists."
+
+    def get(self, request, *args, **kwargs):
+        params = ChangeFeedQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        since = params.validated_data["since"]
+        horizon = changes.get_horizon()
+        if since < horizon:
+            return Response({"detail": self.pruned_message, "horizon": horizon}, status=status.HTTP_410_GONE)
+        return Response(changes.read(since, params.validated_data["limit"]))
+
+
+class MetricsQuerySerializer(serializers.Serializer):
+    top = serializers.IntegerField(min_value=1, max_value=200, default=20)
+    sort = serializers.ChoiceField(
+        choices=["p50_ms", "p95_ms", "p99_ms", "avg_queries", "max_queries", "avg_sql_ms"], default="p95_ms"
+    )
+
+
+class MetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        params = MetricsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(instrumentation.store.report(**params.validated_data))
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class MarketAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'market_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import ensure_product_fts
+
+        post_migrate.connect(ensure_product_fts, sender=self)
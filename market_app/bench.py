@@ -0,0 +1,445 @@
+import asyncio
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+
+from . import documents, stats
+from .counters import recount_markets
+from .metrics import percentile
+from .models import Job, Market, Product, Seller
+
+UNBENCHMARKED_ROUTES = {"metrics"}
+
+
+@contextmanager
+def isolated_database():
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def seed(markets=100, sellers=500, products=10000, fanout=3, batch_size=5000, rng=None):
+    rng = rng or random.Random(0)
+    with transaction.atomic():
+        Market.objects.bulk_create(
+            (
+                Market(
+                    name=f"Market {i}",
+                    location=f"City {i % 50}",
+                    description="Seeded benchmark market.",
+                    net_worth=Decimal(rng.randint(10_000, 10_000_000)),
+                )
+                for i in range(markets)
+            ),
+            batch_size=batch_size,
+        )
+        market_ids = list(Market.objects.values_list("pk", flat=True))
+        Seller.objects.bulk_create(
+            (Seller(name=f"Seller {i}", contact_info=f"seller{i}@example.com") for i in range(sellers)),
+            batch_size=batch_size,
+        )
+        seller_ids = list(Seller.objects.values_list("pk", flat=True))
+        write_links(Seller, seller_ids, market_ids, fanout, batch_size, rng)
+
+        last_pk = Product.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        Product.objects.bulk_create(
+            (
+                Product(
+                    name=f"Product {i}",
+                    description="Seeded benchmark product.",
+                    price=Decimal(rng.randint(50, 50_000)) / 100,
+                    seller_id=rng.choice(seller_ids),
+                )
+                for i in range(products)
+            ),
+            batch_size=batch_size,
+        )
+        product_ids = list(Product.objects.filter(pk__gt=last_pk).values_list("pk", flat=True))
+        write_links(Product, product_ids, market_ids, fanout, batch_size, rng)
+        recount_markets(Seller, seller_ids)
+        recount_markets(Product, product_ids)
+        if documents.is_enabled():
+            for model in documents.READ_MODELS:
+                documents.rebuild(model)
+        if stats.is_materialized():
+            stats.rebuild_market_stats()
+
+
+def write_links(model, pks, market_ids, fanout, batch_size, rng):
+    through = model.markets.through
+    column = f"{model._meta.model_name}_id"
+    links = (
+        through(**{column: pk, "market_id": market_id})
+        for pk in pks
+        for market_id in rng.sample(market_ids, min(len(market_ids), rng.randint(1, fanout * 2 - 1)))
+    )
+    through.objects.bulk_create(links, batch_size=batch_size, ignore_conflicts=True)
+
+
+def summarize(timings, queries, peak, status_code):
+    return {
+        "requests": len(timings),
+        "status": status_code,
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "p99_ms": round(percentile(timings, 0.99), 3),
+        "queries": max(queries),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def send(client, method, url, data=None):
+    return getattr(client, method.lower())(url, data=data, content_type="application/json")
+
+
+def measure(client, method, make_request, iterations):
+    timings = []
+    queries = []
+    status_code = None
+    for _ in range(iterations):
+        url, data = make_request()
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = send(client, method, url, data)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(context.captured_queries))
+        status_code = response.status_code
+
+    url, data = make_request()
+    tracemalloc.start()
+    response = send(client, method, url, data)
+    if response.streaming:
+        b"".join(response.streaming_content)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return summarize(timings, queries, peak, status_code)
+
+
+def route_plans(rng):
+    def pk(model):
+        return model.objects.order_by("?").values_list("pk", flat=True).first()
+
+    def market_payload():
+        return {"name": "Bench Market", "location": "Berlin", "description": "Benchmark.", "net_worth": "1000.00"}
+
+    def seller_payload():
+        return {"name": "Bench Seller", "contact_info": "bench@example.com", "markets_ids": [pk(Market)]}
+
+    def product_payload():
+        return {
+            "name": "Bench Product",
+            "description": "Benchmark.",
+            "price": "9.99",
+            "markets_ids": [pk(Market)],
+            "seller_id": pk(Seller),
+        }
+
+    def membership_payload():
+        add, *remove = Market.objects.order_by("?").values_list("pk", flat=True)[:2]
+        return {"add": [add], "remove": remove}
+
+    def collection(name, query="", data=None):
+        return lambda: (reverse(name) + query, data() if data else None)
+
+    def detail(name, model, data=None, query=""):
+        return lambda: (reverse(name, args=[pk(model)]) + query, data() if data else None)
+
+    def disposable(route, model, **fields):
+        return lambda: (reverse(route, args=[model.objects.create(**fields).pk]), None)
+
+    def bulk_delete_payload():
+        return {"ids": list(Product.objects.order_by("-pk").values_list("pk", flat=True)[:50])}
+
+    return {
+        "home": [
+            ("GET", "", collection("home")),
+            ("GET", "?page_size=100", collection("home", "?page_size=100")),
+            ("POST", "", collection("home", data=market_payload)),
+        ],
+        "market_detail": [
+            ("GET", "", detail("market_detail", Market)),
+            ("PUT", "", detail("market_detail", Market, market_payload)),
+            ("PATCH", "", detail("market_detail", Market, lambda: {"description": "Patched."})),
+            ("DELETE", "", disposable("market_detail", Market, name="Bench", location="-", net_worth=0)),
+        ],
+        "market_stats": [
+            ("GET", "", collection("market_stats")),
+        ],
+        "market_reprice": [
+            ("POST", "", detail("market_reprice", Market, lambda: {"percent": "1.5"})),
+        ],
+        "market_stats_detail": [
+            ("GET", "", detail("market_stats_detail", Market)),
+        ],
+        "market_products": [
+            ("GET", "?page_size=100", detail("market_products", Market, query="?page_size=100")),
+        ],
+        "market_sellers": [
+            ("GET", "?page_size=100", detail("market_sellers", Market, query="?page_size=100")),
+        ],
+        "sellers": [
+            ("GET", "?page_size=100", collection("sellers", "?page_size=100")),
+            ("POST", "", collection("sellers", data=seller_payload)),
+        ],
+        "seller_detail": [
+            ("GET", "", detail("seller_detail", Seller)),
+            ("PUT", "", detail("seller_detail", Seller, seller_payload)),
+            ("PATCH", "", detail("seller_detail", Seller, lambda: {"contact_info": "patched@example.com"})),
+            ("DELETE", "", disposable("seller_detail", Seller, name="Bench", contact_info="-")),
+        ],
+        "seller_markets": [
+            ("POST", "", detail("seller_markets", Seller, membership_payload)),
+        ],
+        "seller_products": [
+            ("GET", "?page_size=100", detail("seller_products", Seller, query="?page_size=100")),
+        ],
+        "products": [
+            ("GET", "?page_size=100", collection("products", "?page_size=100")),
+            ("GET", "?page_size=100&expand=", collection("products", "?page_size=100&expand=")),
+            ("POST", "", collection("products", data=product_payload)),
+        ],
+        "product_bulk": [
+            ("POST", "", collection("product_bulk", data=lambda: [product_payload() for _ in range(50)])),
+            ("DELETE", "", collection("product_bulk", data=bulk_delete_payload)),
+        ],
+        "product_export": [
+            ("GET", "", collection("product_export")),
+        ],
+        "product_detail": [
+            ("GET", "", detail("product_detail", Product)),
+            ("PUT", "", detail("product_detail", Product, product_payload)),
+            ("PATCH", "", detail("product_detail", Product, lambda: {"price": f"{rng.randint(100, 9999) / 100:.2f}"})),
+            ("DELETE", "", disposable("product_detail", Product, name="Bench", price=1)),
+        ],
+        "product_markets": [
+            ("POST", "", detail("product_markets", Product, membership_payload)),
+        ],
+        "changes": [
+            ("GET", "?limit=100", collection("changes", "?limit=100")),
+        ],
+        "jobs": [
+            ("GET", "?page_size=100", collection("jobs", "?page_size=100")),
+        ],
+        "job_detail": [
+            ("GET", "", disposable("job_detail", Job, kind="reprice_market")),
+        ],
+        "async_markets": [
+            ("GET", "", collection("async_markets")),
+            ("GET", "?page_size=100", collection("async_markets", "?page_size=100")),
+        ],
+        "async_market_detail": [
+            ("GET", "", detail("async_market_detail", Market)),
+        ],
+        "async_sellers": [
+            ("GET", "?page_size=100", collection("async_sellers", "?page_size=100")),
+        ],
+        "async_seller_detail": [
+            ("GET", "", detail("async_seller_detail", Seller)),
+        ],
+        "async_products": [
+            ("GET", "?page_size=100", collection("async_products", "?page_size=100")),
+            ("GET", "?page_size=100&expand=", collection("async_products", "?page_size=100&expand=")),
+        ],
+        "async_product_detail": [
+            ("GET", "", detail("async_product_detail", Product)),
+        ],
+    }
+
+
+def run(client, iterations=20, rng=None, routes=None):
+    from market_app.api.urls import urlpatterns
+
+    plans = route_plans(rng or random.Random(0))
+    results = {}
+    for pattern in urlpatterns:
+        if routes and pattern.name not in routes:
+            continue
+        for method, query, make_request in plans.get(pattern.name, []):
+            results[f"{method} /api/{pattern.pattern}{query}"] = measure(client, method, make_request, iterations)
+    return results
+
+
+def unplanned_routes():
+    from market_app.api.urls import urlpatterns
+
+    plans = set(route_plans(random.Random(0)))
+    return [pattern.name for pattern in urlpatterns if pattern.name not in plans | UNBENCHMARKED_ROUTES]
+
+
+def compare(current, baseline):
+    rows = []
+    for route, stats in current.items():
+        previous = baseline.get(route)
+        if previous:
+            rows.append((route, previous["p50_ms"], stats["p50_ms"], stats["p50_ms"] / max(previous["p50_ms"], 1e-9)))
+    return rows
+
+
+def json_codecs():
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from market_app.api import renderers
+
+    codecs = {"stdlib": (JSONRenderer, JSONParser)}
+    if renderers.orjson is not None:
+        codecs["orjson"] = (renderers.ORJSONRenderer, renderers.ORJSONParser)
+    return codecs
+
+
+def time_call(func, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, {
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+    }
+
+
+def run_codecs(payload, iterations=20):
+    results = {}
+    reference = None
+    for name, (renderer_class, parser_class) in json_codecs().items():
+        renderer, parser = renderer_class(), parser_class()
+        body, render_stats = time_call(lambda: renderer.render(payload, "application/json"), iterations)
+        _, parse_stats = time_call(lambda: parser.parse(BytesIO(body)), iterations)
+        reference = reference or body
+        results[name] = {
+            "bytes": len(body),
+            "identical": body == reference,
+            "render": render_stats,
+            "parse": parse_stats,
+        }
+    return results
+
+
+def bench_host():
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*":
+            return host.lstrip(".")
+    return "localhost"
+
+
+def wsgi_get(application, url, delay=0.0):
+    path, _, query = url.partition("?")
+    environ = {"REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": query, "HTTP_HOST": bench_host()}
+    setup_testing_defaults(environ)
+    statuses = []
+    start = time.perf_counter()
+    body = b"".join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+    time.sleep(delay)
+    return int(statuses[0].split()[0]), len(body), (time.perf_counter() - start) * 1000
+
+
+async def asgi_get(application, url, delay=0.0):
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", bench_host().encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 80),
+    }
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    response = {"status": None, "size": 0}
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["size"] += len(message.get("body", b""))
+            if not message.get("more_body"):
+                await asyncio.sleep(delay)
+
+    start = time.perf_counter()
+    await application(scope, receive, send)
+    return response["status"], response["size"], (time.perf_counter() - start) * 1000
+
+
+def summarize_load(results, elapsed):
+    timings = [timing for _, _, timing in results]
+    return {
+        "requests": len(results),
+        "errors": sum(1 for status, _, _ in results if status >= 400),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(results) / elapsed, 1),
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "bytes": max(size for _, size, _ in results),
+    }
+
+
+def run_wsgi_load(application, url, requests=200, threads=4, delay=0.0):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lambda _: wsgi_get(application, url, delay), range(requests)))
+    return summarize_load(results, time.perf_counter() - start)
+
+
+def run_asgi_load(application, url, requests=200, concurrency=50, delay=0.0):
+    async def load():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def request():
+            async with semaphore:
+                return await asgi_get(application, url, delay)
+
+        return await asyncio.gather(*(request() for _ in range(requests)))
+
+    start = time.perf_counter()
+    results = asyncio.run(load())
+    return summarize_load(results, time.perf_counter() - start)
+
+
+def run_handlers(handlers, urls, requests=200):
+    results = {}
+    for url in urls:
+        for name, handler in handlers.items():
+            wsgi_get(handler, url)
+            start = time.perf_counter()
+            samples = [wsgi_get(handler, url) for _ in range(requests)]
+            results[f"{name} {url}"] = summarize_load(samples, time.perf_counter() - start)
+    return results
+
+
+def dumps(report):
+    return json.dumps(report, indent=2, sort_keys=True)
@@ -0,0 +1,52 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+DEPENDENTS = {
+    "market": ("market", "seller", "product"),
+    "seller": ("seller", "product"),
+    "product": ("product",),
+}
+
+
+def generation_key(model_name):
+    return f"market_app:generation:{model_name}"
+
+
+def get_generation(model_name):
+    return cache.get_or_set(generation_key(model_name), time.time_ns(), timeout=None)
+
+
+def bump_generation(model_name):
+    try:
+        cache.incr(generation_key(model_name))
+    except ValueError:
+        cache.set(generation_key(model_name), time.time_ns(), timeout=None)
+
+
+def invalidate(model):
+    model_names = DEPENDENTS[model._meta.model_name]
+
+    def bump():
+        for model_name in model_names:
+            bump_generation(model_name)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def response_cache_key(model, pk, request):
+    model_name = model._meta.model_name
+    variant = hashlib.md5(request.META.get("QUERY_STRING", "").encode()).hexdigest()
+    return f"market_app:response:{model_name}:{get_generation(model_name)}:{pk}:{variant}"
+
+
+def is_enabled():
+    return getattr(settings, "API_CACHE_ENABLED", False)
+
+
+def get_timeout():
+    return getattr(settings, "API_CACHE_TIMEOUT", 300)
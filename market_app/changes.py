@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+
+from .api.fast import FastMarketSerializer, FastProductSerializer, FastSellerSerializer
+from .models import Change, ChangeHorizon
+
+FEED_SERIALIZERS = {
+    "market": FastMarketSerializer,
+    "seller": FastSellerSerializer,
+    "product": FastProductSerializer,
+}
+
+
+def get_retention():
+    return timedelta(days=getattr(settings, "CHANGE_FEED_RETENTION_DAYS", 30))
+
+
+def get_settle_window():
+    return timedelta(seconds=getattr(settings, "CHANGE_FEED_SETTLE_SECONDS", 0))
+
+
+def record(model, pks, action=Change.UPSERT):
+    if pks:
+        model_name = model._meta.model_name
+        Change.objects.bulk_create([Change(model=model_name, object_id=pk, action=action) for pk in sorted(pks)])
+
+
+def get_horizon():
+    return ChangeHorizon.objects.values_list("sequence", flat=True).first() or 0
+
+
+def read(since, limit):
+    queryset = Change.objects.filter(pk__gt=since)
+    window = get_settle_window()
+    if window:
+        unsettled = queryset.filter(created_at__gt=timezone.now() - window)
+        pending = unsettled.order_by("pk").values_list("pk", flat=True).first()
+        if pending is not None:
+            queryset = queryset.filter(pk__lt=pending)
+    rows = list(queryset.order_by("pk")[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    latest = {}
+    for row in rows:
+        latest[(row.model, row.object_id)] = row
+    records = sorted(latest.values(), key=lambda row: row.pk)
+    data = render_upserts(records)
+    changes = []
+    for row in records:
+        item = {"sequence": row.pk, "model": row.model, "id": row.object_id, "action": row.action}
+        if row.action == Change.UPSERT:
+            item["data"] = data[row.model].get(row.object_id)
+            if item["data"] is None:
+                continue
+        changes.append(item)
+    return {"changes": changes, "next": rows[-1].pk if rows else since, "has_more": has_more}
+
+
+def render_upserts(records):
+    data = {}
+    for model_name, serializer_class in FEED_SERIALIZERS.items():
+        pks = [row.object_id for row in records if row.model == model_name and row.action == Change.UPSERT]
+        serializer = serializer_class(expand=[])
+        data[model_name] = {item["id"]: item for item in serializer.render(serializer.fetch(pks))} if pks else {}
+    return data
+
+
+def compact():
+    superseded = Change.objects.filter(
+        Exists(Change.objects.filter(model=OuterRef("model"), object_id=OuterRef("object_id"), pk__gt=OuterRef("pk")))
+    )
+    deleted, _ = superseded.delete()
+    return deleted
+
+
+def prune(retention=None):
+    cutoff = timezone.now() - (retention if retention is not None else get_retention())
+    expired = Change.objects.filter(created_at__lt=cutoff)
+    with transaction.atomic():
+        sequence = expired.aggregate(Max("pk"))["pk__max"]
+        if sequence is None:
+            return 0
+        deleted, _ = Change.objects.filter(pk__lte=sequence).delete()
+        ChangeHorizon.objects.update_or_create(pk=1, defaults={"sequence": max(sequence, get_horizon())})
+    return deleted
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+
+
+def market_count_subquery(model):
+    return Subquery(model.objects.filter(pk=OuterRef("pk")).annotate(total=Count("markets")).values("total"))
+
+
+def recount_markets(model, pks, batch_size=1000):
+    pks = list(pks)
+    for start in range(0, len(pks), batch_size):
+        model.objects.filter(pk__in=pks[start : start + batch_size]).update(market_count=market_count_subquery(model))
+
+
+def repair_market_counts(model, batch_size=1000):
+    repaired = 0
+    last_pk = 0
+    while True:
+        pks = list(model.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return repaired
+        last_pk = pks[-1]
+        with transaction.atomic():
+            drifted = list(
+                model.objects.filter(pk__in=pks)
+                .annotate(actual=Count("markets"))
+                .exclude(market_count=F("actual"))
+                .values_list("pk", flat=True)
+            )
+            recount_markets(model, drifted)
+        repaired += len(drifted)
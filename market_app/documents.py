@@ -0,0 +1,119 @@
+import json
+
+from django.conf import settings
+
+from . import cache
+from .api.fast import FastProductSerializer, FastSellerSerializer
+from .api.renderers import ORJSONRenderer
+from .models import Market, Product, ProductDocument, Seller, SellerDocument
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BATCH_SIZE = 500
+
+READ_MODELS = {
+    Product: (FastProductSerializer, ProductDocument),
+    Seller: (FastSellerSerializer, SellerDocument),
+}
+
+
+def is_enabled():
+    return getattr(settings, "READ_MODEL_ENABLED", True)
+
+
+def dumps(data):
+    return ORJSONRenderer().render(data).decode()
+
+
+def loads(body):
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def render(model, pks):
+    serializer = READ_MODELS[model][0]()
+    return {item["id"]: item for item in serializer.render(serializer.fetch(sorted(pks)))}
+
+
+def write_documents(model, pks, batch_size=BATCH_SIZE):
+    document_model = READ_MODELS[model][1]
+    owner = document_model._meta.pk.name
+    pks = sorted(pks)
+    for start in range(0, len(pks), batch_size):
+        items = render(model, pks[start : start + batch_size])
+        document_model.objects.bulk_create(
+            [document_model(**{f"{owner}_id": pk}, body=dumps(item)) for pk, item in items.items()],
+            update_conflicts=True,
+            unique_fields=[owner],
+            update_fields=["body", "updated_at"],
+        )
+
+
+def refresh_products(pks):
+    if is_enabled() and pks:
+        write_documents(Product, pks)
+
+
+def refresh_sellers(pks):
+    refresh_members(pks, ())
+
+
+def refresh_members(seller_pks, product_pks):
+    if not is_enabled():
+        return
+    seller_pks = sorted(seller_pks)
+    product_pks = set(product_pks)
+    for start in range(0, len(seller_pks), BATCH_SIZE):
+        batch = seller_pks[start : start + BATCH_SIZE]
+        write_documents(Seller, batch)
+        product_pks.update(Product.objects.filter(seller__in=batch).values_list("pk", flat=True))
+    write_documents(Product, product_pks)
+
+
+def refresh_markets(pks):
+    if is_enabled() and pks:
+        refresh_market_members(pks)
+
+
+def refresh_market_members(pks, seller_pks=(), product_pks=()):
+    seller_pks, product_pks, pks = set(seller_pks), set(product_pks), sorted(pks)
+    for start in range(0, len(pks), BATCH_SIZE):
+        batch = pks[start : start + BATCH_SIZE]
+        seller_pks.update(Seller.objects.filter(markets__in=batch).values_list("pk", flat=True))
+        product_pks.update(Product.objects.filter(markets__in=batch).values_list("pk", flat=True))
+    refresh_members(seller_pks, product_pks)
+    cache.invalidate(Market)
+
+
+def iter_pk_batches(model, batch_size):
+    last_pk = 0
+    while True:
+        pks = list(model.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return
+        last_pk = pks[-1]
+        yield pks
+
+
+def rebuild(model, batch_size=1000):
+    rebuilt = 0
+    for pks in iter_pk_batches(model, batch_size):
+        write_documents(model, pks, batch_size)
+        rebuilt += len(pks)
+    return rebuilt
+
+
+def check(model, batch_size=1000):
+    document_model = READ_MODELS[model][1]
+    owner = f"{document_model._meta.pk.name}_id"
+    missing, stale = [], []
+    for pks in iter_pk_batches(model, batch_size):
+        bodies = dict(document_model.objects.filter(**{f"{owner}__in": pks}).values_list(owner, "body"))
+        for pk, item in render(model, pks).items():
+            if pk not in bodies:
+                missing.append(pk)
+            elif loads(bodies[pk]) != loads(dumps(item)):
+                stale.append(pk)
+    return {"missing": missing, "stale": stale}
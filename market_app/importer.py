@@ -0,0 +1,243 @@
+import csv
+import json
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from . import documents, stats
+from .models import Market, Product, Seller
+from .signals import bulk_changed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LIST_SEPARATOR = "|"
+
+
+class CatalogImportError(ValueError):
+    pass
+
+
+def loads(text):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def detect_format(path):
+    return "csv" if Path(path).suffix.lower() == ".csv" else "ndjson"
+
+
+def read_rows(path, format=None):
+    format = format or detect_format(path)
+    with open(path, newline="", encoding="utf-8") as handle:
+        if format == "csv":
+            reader = csv.DictReader(handle)
+            for row in reader:
+                yield f"{path}:{reader.line_num}", row
+        else:
+            for number, text in enumerate(handle, start=1):
+                if text.strip():
+                    try:
+                        yield f"{path}:{number}", loads(text)
+                    except ValueError as exc:
+                        raise CatalogImportError(f"{path}:{number}: invalid JSON ({exc})")
+
+
+def iter_chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def resolve_external_ids(model, external_ids, using="default"):
+    resolved = {}
+    external_ids = list(external_ids)
+    size = connections[using].features.max_query_params or 10000
+    for start in range(0, len(external_ids), size):
+        resolved.update(
+            model.objects.using(using)
+            .filter(external_id__in=external_ids[start : start + size])
+            .values_list("external_id", "pk")
+        )
+    return resolved
+
+
+class CatalogImporter:
+    model = None
+    fields = ()
+    decimal_fields = ()
+    related_fields = ()
+    has_markets = False
+
+    def __init__(self, chunk_size=5000, progress=None):
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.changed = set()
+
+    def run(self, rows):
+        started = time.perf_counter()
+        imported = 0
+        for chunk in iter_chunks(rows, self.chunk_size):
+            with transaction.atomic():
+                pks = self.write(chunk)
+            self.changed |= pks
+            imported += len(chunk)
+            if self.progress:
+                self.progress(self.model, imported, time.perf_counter() - started)
+        return imported, time.perf_counter() - started
+
+    def write(self, chunk):
+        items = {}
+        for source, row in chunk:
+            item = self.clean(source, row)
+            items[item["external_id"]] = item
+        references = self.resolve(items.values())
+        now = timezone.now()
+        objects = [self.build(item, references, now) for item in items.values()]
+        self.model.objects.bulk_create(
+            objects,
+            batch_size=self.chunk_size,
+            update_conflicts=True,
+            unique_fields=["external_id"],
+            update_fields=[*self.fields, *self.related_fields, "updated_at"],
+        )
+        pks = resolve_external_ids(self.model, items)
+        if self.has_markets:
+            self.write_markets(pks, items, references["markets"])
+        return set(pks.values())
+
+    def clean(self, source, row):
+        if not isinstance(row, dict):
+            raise CatalogImportError(f"{source}: expected an object")
+        item = {}
+        for name in ("external_id", *self.fields):
+            value = row.get(name)
+            if value is None:
+                raise CatalogImportError(f"{source}: missing {name}")
+            item[name] = self.clean_decimal(source, name, value) if name in self.decimal_fields else str(value)
+        if not item["external_id"]:
+            raise CatalogImportError(f"{source}: missing external_id")
+        if self.has_markets and row.get("markets") is not None:
+            item["markets"] = self.clean_list(row["markets"])
+        item["source"] = source
+        return item
+
+    def clean_decimal(self, source, name, value):
+        try:
+            value = Decimal(str(value))
+        except InvalidOperation:
+            raise CatalogImportError(f"{source}: {name} is not a number")
+        if not value.is_finite() or value < 0:
+            raise CatalogImportError(f"{source}: {name} must be a non-negative number")
+        return value
+
+    def clean_list(self, value):
+        if isinstance(value, str):
+            value = value.split(LIST_SEPARATOR)
+        return [str(item).strip() for item in value if str(item).strip()]
+
+    def resolve(self, items):
+        if not self.has_markets:
+            return {}
+        return {"markets": self.resolve_references(Market, items, lambda item: item.get("markets", ()))}
+
+    def resolve_references(self, model, items, references):
+        resolved = resolve_external_ids(model, {external_id for item in items for external_id in references(item)})
+        for item in items:
+            missing = [external_id for external_id in references(item) if external_id not in resolved]
+            if missing:
+                raise CatalogImportError(f"{item['source']}: unknown {model._meta.verbose_name} {missing[0]}")
+        return resolved
+
+    def build(self, item, references, now):
+        return self.model(
+            external_id=item["external_id"], updated_at=now, **{name: item[name] for name in self.fields}
+        )
+
+    def write_markets(self, pks, items, markets):
+        through = self.model.markets.through
+        column = f"{self.model._meta.model_name}_id"
+        owners = [pks[external_id] for external_id, item in items.items() if "markets" in item]
+        if not owners:
+            return
+        for start in range(0, len(owners), self.chunk_size):
+            through.objects.filter(**{f"{column}__in": owners[start : start + self.chunk_size]}).delete()
+        through.objects.bulk_create(
+            [
+                through(**{column: pks[external_id], "market_id": markets[market]})
+                for external_id, item in items.items()
+                for market in dict.fromkeys(item.get("markets", ()))
+            ],
+            batch_size=self.chunk_size,
+            ignore_conflicts=True,
+        )
+
+
+class MarketImporter(CatalogImporter):
+    model = Market
+    fields = ("name", "location", "description", "net_worth")
+    decimal_fields = ("net_worth",)
+
+
+class SellerImporter(CatalogImporter):
+    model = Seller
+    fields = ("name", "contact_info")
+    has_markets = True
+
+
+class ProductImporter(CatalogImporter):
+    model = Product
+    fields = ("name", "description", "price")
+    decimal_fields = ("price",)
+    related_fields = ("seller",)
+    has_markets = True
+
+    def clean(self, source, row):
+        item = super().clean(source, row)
+        seller = row.get("seller")
+        item["seller"] = str(seller).strip() if seller is not None else ""
+        return item
+
+    def resolve(self, items):
+        references = super().resolve(items)
+        references["sellers"] = self.resolve_references(Seller, items, lambda item: filter(None, [item["seller"]]))
+        return references
+
+    def build(self, item, references, now):
+        product = super().build(item, references, now)
+        product.seller_id = references["sellers"].get(item["seller"])
+        return product
+
+
+IMPORTERS = {"markets": MarketImporter, "sellers": SellerImporter, "products": ProductImporter}
+
+
+def import_catalog(sources, chunk_size=5000, format=None, progress=None):
+    results = {}
+    changed = {}
+    try:
+        for name, importer_class in IMPORTERS.items():
+            if sources.get(name):
+                importer = importer_class(chunk_size=chunk_size, progress=progress)
+                changed[importer.model] = importer.changed
+                results[name] = importer.run(read_rows(sources[name], format))
+    finally:
+        notify(changed)
+    return results
+
+
+def notify(changed):
+    changed = {model: pks for model, pks in changed.items() if pks}
+    if not changed:
+        return
+    for model, pks in changed.items():
+        bulk_changed.send(sender=model, pks=pks, market_pks=(), refresh_documents=False)
+    if documents.is_enabled():
+        documents.refresh_market_members(changed.get(Market, ()), changed.get(Seller, ()), changed.get(Product, ()))
+    if stats.is_materialized():
+        stats.rebuild_market_stats()
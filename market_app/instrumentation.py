@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from .metrics import percentile
+
+DEFAULTS = {
+    "ENABLED": False,
+    "PATH_PREFIX": "/api/",
+    "MAX_ROUTES": 200,
+    "MAX_SAMPLES": 1000,
+    "DUPLICATE_THRESHOLD": 5,
+}
+
+current_metrics = ContextVar("current_metrics", default=None)
+
+
+def get_setting(name):
+    return getattr(settings, "API_INSTRUMENTATION", {}).get(name, DEFAULTS[name])
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serialize_time = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def duplicates(self, threshold):
+        return {sql: count for sql, count in self.statements.items() if count >= threshold}
+
+
+@contextmanager
+def span(name):
+    metrics = current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    sql_before = metrics.sql_time
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start - (metrics.sql_time - sql_before)
+        setattr(metrics, f"{name}_time", getattr(metrics, f"{name}_time") + elapsed)
+
+
+class MetricsStore:
+    def __init__(self, max_routes, max_samples):
+        self.max_routes = max_routes
+        self.max_samples = max_samples
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def record(self, route, sample, duplicates):
+        with self.lock:
+            entry = self.routes.get(route)
+            if entry is None:
+                if len(self.routes) >= self.max_routes:
+                    return
+                entry = self.routes[route] = {"samples": deque(maxlen=self.max_samples), "duplicates": {}}
+            entry["samples"].append(sample)
+            for sql, count in duplicates.items():
+                if sql in entry["duplicates"] or len(entry["duplicates"]) < 10:
+                    entry["duplicates"][sql] = max(count, entry["duplicates"].get(sql, 0))
+
+    def clear(self):
+        with self.lock:
+            self.routes.clear()
+
+    def report(self, top=20, sort="p95_ms"):
+        with self.lock:
+            routes = {
+                route: (list(entry["samples"]), dict(entry["duplicates"])) for route, entry in self.routes.items()
+            }
+        rows = []
+        for route, (samples, duplicates) in routes.items():
+            durations = [sample["total_ms"] for sample in samples]
+            sizes = [sample["size"] for sample in samples if sample["size"] is not None]
+            rows.append(
+                {
+                    "route": route,
+                    "requests": len(samples),
+                    "p50_ms": round(percentile(durations, 0.50), 3),
+                    "p95_ms": round(percentile(durations, 0.95), 3),
+                    "p99_ms": round(percentile(durations, 0.99), 3),
+                    "avg_queries": round(sum(sample["queries"] for sample in samples) / len(samples), 2),
+                    "max_queries": max(sample["queries"] for sample in samples),
+                    "avg_sql_ms": round(sum(sample["sql_ms"] for sample in samples) / len(samples), 3),
+                    "avg_serialize_ms": round(sum(sample["serialize_ms"] for sample in samples) / len(samples), 3),
+                    "avg_size_bytes": round(sum(sizes) / len(sizes)) if sizes else None,
+                    "duplicate_queries": [
+                        {"sql": sql, "count": count}
+                        for sql, count in sorted(duplicates.items(), key=lambda item: -item[1])
+                    ],
+                }
+            )
+        rows.sort(key=lambda row: row[sort], reverse=True)
+        return rows[:top]
+
+
+store = MetricsStore(get_setting("MAX_ROUTES"), get_setting("MAX_SAMPLES"))
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = get_setting("PATH_PREFIX")
+        self.threshold = get_setting("DUPLICATE_THRESHOLD")
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not request.path.startswith(self.prefix):
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with self.wrap_connections(metrics):
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if not request.path.startswith(self.prefix):
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        start = time.perf_counter()
+        stack = await sync_to_async(self.wrap_connections)(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    def wrap_connections(self, metrics):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(metrics))
+        return stack
+
+    def finish(self, request, response, metrics, total):
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={metrics.sql_time * 1000:.2f};desc="{metrics.queries} queries"',
+                f"serialize;dur={metrics.serialize_time * 1000:.2f}",
+                f"total;dur={total * 1000:.2f}",
+            ]
+        )
+        match = request.resolver_match
+        route = f"{request.method} /{match.route}" if match else f"{request.method} <unresolved>"
+        sample = {
+            "total_ms": total * 1000,
+            "queries": metrics.queries,
+            "sql_ms": metrics.sql_time * 1000,
+            "serialize_ms": metrics.serialize_time * 1000,
+            "size": None if response.streaming else len(response.content),
+        }
+        store.record(route, sample, metrics.duplicates(self.threshold))
+        return response
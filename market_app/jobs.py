@@ -0,0 +1,166 @@
+import time
+import traceback
+from contextvars import ContextVar
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Round
+from django.utils import timezone
+
+from . import stats
+from .models import Job, Product, Seller
+from .signals import bulk_changed, member_market_pks
+
+handlers = {}
+retryable = set()
+current_job = ContextVar("current_job", default=None)
+
+
+class LeaseLost(Exception):
+    pass
+
+
+def job(kind, retry=False):
+    def register(func):
+        handlers[kind] = func
+        if retry:
+            retryable.add(kind)
+        return func
+
+    return register
+
+
+def enqueue(kind, **payload):
+    if kind not in handlers:
+        raise KeyError(f"Unknown job kind {kind!r}.")
+    return Job.objects.create(kind=kind, payload=payload)
+
+
+def get_lease():
+    return timedelta(seconds=getattr(settings, "JOB_LEASE_SECONDS", 300))
+
+
+def get_max_attempts():
+    return getattr(settings, "JOB_MAX_ATTEMPTS", 3)
+
+
+def claim_next():
+    while True:
+        now = timezone.now()
+        claimable = Job.objects.filter(Q(status=Job.QUEUED) | Q(status=Job.RUNNING, lease_expires_at__lt=now))
+        candidate = claimable.order_by("pk").values("pk", "kind", "status", "attempts").first()
+        if candidate is None:
+            return None
+        claimable = claimable.filter(**candidate)
+        if candidate["status"] == Job.RUNNING and candidate["kind"] not in retryable:
+            claimable.update(status=Job.FAILED, error="Lease expired; this job kind is not retried.", finished_at=now)
+            continue
+        if candidate["attempts"] >= get_max_attempts():
+            claimable.update(status=Job.FAILED, error="Lease expired too many times.", finished_at=now)
+            continue
+        claimed = claimable.update(
+            status=Job.RUNNING, started_at=now, lease_expires_at=now + get_lease(), attempts=F("attempts") + 1
+        )
+        if claimed:
+            return Job.objects.get(pk=candidate["pk"])
+
+
+def heartbeat(**progress):
+    job = current_job.get()
+    if job is None:
+        return
+    job.lease_expires_at = timezone.now() + get_lease()
+    job.progress = {**job.progress, **progress}
+    renewed = Job.objects.filter(pk=job.pk, status=Job.RUNNING, attempts=job.attempts).update(
+        lease_expires_at=job.lease_expires_at, progress=job.progress
+    )
+    if not renewed:
+        raise LeaseLost(f"Job #{job.pk} attempt {job.attempts} no longer holds its lease.")
+
+
+def get_progress(name, default=None):
+    job = current_job.get()
+    return default if job is None else job.progress.get(name, default)
+
+
+def run_job(job):
+    token = current_job.set(job)
+    try:
+        result = handlers[job.kind](**job.payload)
+    except Exception:
+        job.status, job.error = Job.FAILED, traceback.format_exc()
+    else:
+        job.status, job.result = Job.SUCCEEDED, result
+    finally:
+        current_job.reset(token)
+    job.finished_at = timezone.now()
+    Job.objects.filter(pk=job.pk, attempts=job.attempts).update(
+        status=job.status, result=job.result, error=job.error, finished_at=job.finished_at
+    )
+    return job
+
+
+def run_pending(limit=None):
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+def work(burst=False, poll_interval=1.0):
+    processed = 0
+    try:
+        while True:
+            close_old_connections()
+            processed += run_pending()
+            if burst:
+                return processed
+            time.sleep(poll_interval)
+    finally:
+        connections.close_all()
+
+
+def batched_pks(queryset, batch_size):
+    last_pk = get_progress("last_pk", 0)
+    while True:
+        pks = list(queryset.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return
+        last_pk = pks[-1]
+        yield pks
+
+
+@job("reprice_market", retry=True)
+def reprice_market(market_id, percent, batch_size=1000):
+    factor = 1 + Decimal(str(percent)) / 100
+    updated = get_progress("updated", 0)
+    products = Product.objects.filter(markets=market_id)
+    for pks in batched_pks(products, batch_size):
+        with transaction.atomic():
+            updated += Product.objects.filter(pk__in=pks).update(
+                price=Round(F("price") * factor, 2), updated_at=timezone.now()
+            )
+            bulk_changed.send(sender=Product, pks=set(pks), market_pks=())
+            heartbeat(last_pk=pks[-1], updated=updated)
+    if stats.is_materialized():
+        stats.refresh_market_stats(member_market_pks(Product, products.values("pk")))
+    return {"market": market_id, "updated": updated}
+
+
+@job("delete_seller", retry=True)
+def delete_seller(seller_id, batch_size=1000):
+    detached = get_progress("detached", 0)
+    for pks in batched_pks(Product.objects.filter(seller=seller_id), batch_size):
+        with transaction.atomic():
+            detached += Product.objects.filter(pk__in=pks).update(seller=None, updated_at=timezone.now())
+            bulk_changed.send(sender=Product, pks=set(pks), market_pks=())
+            heartbeat(last_pk=pks[-1], detached=detached)
+    deleted, _ = Seller.objects.filter(pk=seller_id).delete()
+    return {"seller": seller_id, "deleted": bool(deleted), "detached_products": detached}
@@ -0,0 +1,60 @@
+import json
+import random
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from market_app import bench
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database with a configurable catalog and benchmark every route in "
+        "market_app/api/urls.py. Reports latency percentiles, queries per request and peak memory as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--markets", type=int, default=100)
+        parser.add_argument("--sellers", type=int, default=500)
+        parser.add_argument("--products", type=int, default=10000)
+        parser.add_argument("--fanout", type=int, default=3, help="Average number of markets per seller/product.")
+        parser.add_argument("--iterations", type=int, default=20, help="Timed requests per route and method.")
+        parser.add_argument("--route", action="append", dest="routes", help="Only benchmark this route name.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+        parser.add_argument("--compare", help="Print p50 ratios against a previous JSON report.")
+        parser.add_argument(
+            "--no-isolate",
+            action="store_true",
+            help="Run against the configured database instead of a freshly created test database.",
+        )
+
+    def handle(self, *args, **options):
+        for name in bench.unplanned_routes():
+            self.stderr.write(f"No benchmark plan for route {name!r}")
+
+        if options["no_isolate"]:
+            report = self.benchmark(options)
+        else:
+            with bench.isolated_database():
+                report = self.benchmark(options)
+
+        output = bench.dumps(report)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                baseline = json.load(file)["routes"]
+            for route, before, after, ratio in bench.compare(report["routes"], baseline):
+                self.stderr.write(f"{route}: p50 {before:.3f}ms -> {after:.3f}ms ({ratio:.2f}x)")
+
+    def benchmark(self, options):
+        rng = random.Random(options["seed"])
+        volumes = {key: options[key] for key in ("markets", "sellers", "products", "fanout")}
+        bench.seed(rng=rng, **volumes)
+        routes = bench.run(Client(), iterations=options["iterations"], rng=rng, routes=options["routes"])
+        return {"volumes": volumes, "iterations": options["iterations"], "seed": options["seed"], "routes": routes}
@@ -0,0 +1,69 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from market_app import bench
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database and fire concurrent GET requests at the WSGI application (sync views, "
+        "thread pool) and the ASGI application (sync and async views, one event loop). Reports throughput "
+        "and latency percentiles as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--markets", type=int, default=100)
+        parser.add_argument("--sellers", type=int, default=500)
+        parser.add_argument("--products", type=int, default=10000)
+        parser.add_argument("--fanout", type=int, default=3, help="Average number of markets per seller/product.")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per application and route.")
+        parser.add_argument("--concurrency", type=int, default=50, help="Concurrent clients against the ASGI app.")
+        parser.add_argument("--threads", type=int, default=4, help="Worker threads serving the WSGI app.")
+        parser.add_argument(
+            "--client-delay", type=float, default=0.0, help="Milliseconds each client takes to read its response."
+        )
+        parser.add_argument("--query", default="?page_size=50", help="Query string appended to every route.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--no-isolate",
+            action="store_true",
+            help="Run against the configured database instead of a freshly created test database.",
+        )
+
+    def handle(self, *args, **options):
+        if options["no_isolate"]:
+            report = self.benchmark(options)
+        else:
+            with bench.isolated_database():
+                report = self.benchmark(options)
+        self.stdout.write(bench.dumps(report))
+
+    def benchmark(self, options):
+        from supermarket.asgi import application as asgi_application
+        from supermarket.wsgi import application as wsgi_application
+
+        volumes = {key: options[key] for key in ("markets", "sellers", "products", "fanout")}
+        bench.seed(rng=random.Random(options["seed"]), **volumes)
+        requests, delay = options["requests"], options["client_delay"] / 1000
+        sync_url = f"/api/products/{options['query']}"
+        async_url = f"/api/async/products/{options['query']}"
+        runs = {
+            f"WSGI {sync_url}": lambda: bench.run_wsgi_load(
+                wsgi_application, sync_url, requests, options["threads"], delay
+            ),
+            f"ASGI {sync_url}": lambda: bench.run_asgi_load(
+                asgi_application, sync_url, requests, options["concurrency"], delay
+            ),
+            f"ASGI {async_url}": lambda: bench.run_asgi_load(
+                asgi_application, async_url, requests, options["concurrency"], delay
+            ),
+        }
+        return {
+            "volumes": volumes,
+            "requests": requests,
+            "concurrency": options["concurrency"],
+            "threads": options["threads"],
+            "client_delay_ms": options["client_delay"],
+            "runs": {name: run() for name, run in runs.items()},
+        }
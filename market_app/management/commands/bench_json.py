@@ -0,0 +1,52 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from market_app import bench
+from market_app.api.fast import FastProductSerializer
+from market_app.api.serializers import ProductSerializer
+from market_app.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Render and parse a seeded product list with every available JSON renderer/parser pair "
+        "(stdlib and orjson) and report timings and whether the output bytes match."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--markets", type=int, default=100)
+        parser.add_argument("--sellers", type=int, default=500)
+        parser.add_argument("--products", type=int, default=10000)
+        parser.add_argument("--fanout", type=int, default=3, help="Average number of markets per seller/product.")
+        parser.add_argument("--iterations", type=int, default=20, help="Timed renders and parses per codec.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--no-isolate",
+            action="store_true",
+            help="Run against the configured database instead of a freshly created test database.",
+        )
+
+    def handle(self, *args, **options):
+        if options["no_isolate"]:
+            report = self.benchmark(options)
+        else:
+            with bench.isolated_database():
+                report = self.benchmark(options)
+        self.stdout.write(bench.dumps(report))
+
+    def benchmark(self, options):
+        volumes = {key: options[key] for key in ("markets", "sellers", "products", "fanout")}
+        bench.seed(rng=random.Random(options["seed"]), **volumes)
+        serializer = FastProductSerializer()
+        products = serializer.render(list(serializer.values(Product.objects.order_by("pk"))))
+        queryset = ProductSerializer.setup_eager_loading(Product.objects.order_by("pk"))
+        payloads = {
+            "products": products,
+            "products_drf": ProductSerializer(queryset, many=True).data,
+        }
+        return {
+            "volumes": volumes,
+            "iterations": options["iterations"],
+            "payloads": {name: bench.run_codecs(payload, options["iterations"]) for name, payload in payloads.items()},
+        }
@@ -0,0 +1,56 @@
+import random
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+
+from market_app import bench
+from market_app.models import Market, Product
+from supermarket.handlers import APIWSGIHandler
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database and time the same api/ requests through the full MIDDLEWARE stack and the "
+        "API mode stack (API_MODE['MIDDLEWARE']). Reports latency per stack and the per-request saving as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--markets", type=int, default=20)
+        parser.add_argument("--sellers", type=int, default=50)
+        parser.add_argument("--products", type=int, default=200)
+        parser.add_argument("--fanout", type=int, default=3, help="Average number of markets per seller/product.")
+        parser.add_argument("--requests", type=int, default=500, help="Sequential requests per stack and URL.")
+        parser.add_argument("--url", action="append", dest="urls", help="Only benchmark this path (repeatable).")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--no-isolate",
+            action="store_true",
+            help="Run against the configured database instead of a freshly created test database.",
+        )
+
+    def handle(self, *args, **options):
+        if options["no_isolate"]:
+            report = self.benchmark(options)
+        else:
+            with bench.isolated_database():
+                report = self.benchmark(options)
+        self.stdout.write(bench.dumps(report))
+
+    def benchmark(self, options):
+        volumes = {key: options[key] for key in ("markets", "sellers", "products", "fanout")}
+        bench.seed(rng=random.Random(options["seed"]), **volumes)
+        urls = options["urls"] or [
+            f"/api/markets/{Market.objects.values_list('pk', flat=True).first()}/",
+            f"/api/products/{Product.objects.values_list('pk', flat=True).first()}/?expand=",
+            "/api/products/?page_size=10&expand=",
+        ]
+        handlers = {"full": WSGIHandler(), "api": APIWSGIHandler()}
+        runs = bench.run_handlers(handlers, urls, options["requests"])
+        return {
+            "volumes": volumes,
+            "requests": options["requests"],
+            "runs": runs,
+            "saving_ms": {
+                url: round(runs[f"full {url}"]["p50_ms"] - runs[f"api {url}"]["p50_ms"], 3) for url in urls
+            },
+        }
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from market_app import documents
+
+
+class Command(BaseCommand):
+    help = "Compare the ProductDocument and SellerDocument rows against a fresh rendering and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--repair", action="store_true", help="Re-render missing and stale documents.")
+
+    def handle(self, *args, **options):
+        drifted = 0
+        for model in documents.READ_MODELS:
+            report = documents.check(model, batch_size=options["batch_size"])
+            pks = report["missing"] + report["stale"]
+            name = model._meta.verbose_name_plural
+            self.stdout.write(f"{name}: {len(report['missing'])} missing, {len(report['stale'])} stale")
+            if pks and options["repair"]:
+                documents.write_documents(model, pks)
+                self.stdout.write(f"{name}: repaired {len(pks)}")
+            elif pks:
+                drifted += len(pks)
+        if drifted:
+            raise CommandError(f"{drifted} documents are out of date; run with --repair or rebuild_read_model.")
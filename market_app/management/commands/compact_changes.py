@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from market_app import changes
+
+
+class Command(BaseCommand):
+    help = "Drop change feed records superseded by a newer one for the same object and prune expired records."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retention-days", type=float, help="Defaults to CHANGE_FEED_RETENTION_DAYS.")
+
+    def handle(self, *args, **options):
+        compacted = changes.compact()
+        days = options["retention_days"]
+        pruned = changes.prune(timedelta(days=days) if days is not None else None)
+        self.stdout.write(f"Compacted {compacted} and pruned {pruned} changes; horizon is {changes.get_horizon()}.")
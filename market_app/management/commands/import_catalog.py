@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from market_app.importer import IMPORTERS, CatalogImportError, import_catalog
+
+
+class Command(BaseCommand):
+    help = "Stream CSV or NDJSON feeds of markets, sellers and products into the catalog, upserting on external_id."
+
+    def add_arguments(self, parser):
+        for name in IMPORTERS:
+            parser.add_argument(f"--{name}", metavar="PATH")
+        parser.add_argument("--format", choices=["csv", "ndjson"])
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        sources = {name: options[name] for name in IMPORTERS if options[name]}
+        if not sources:
+            raise CommandError(f"Provide at least one of {', '.join(f'--{name}' for name in IMPORTERS)}.")
+        progress = self.report_progress if options["verbosity"] > 0 else None
+        try:
+            results = import_catalog(sources, options["chunk_size"], options["format"], progress)
+        except (CatalogImportError, OSError) as exc:
+            raise CommandError(exc)
+        for name, (imported, elapsed) in results.items():
+            self.stdout.write(f"{name}: imported {imported} rows in {elapsed:.1f}s ({self.rate(imported, elapsed)})")
+
+    def report_progress(self, model, imported, elapsed):
+        self.stderr.write(f"{model._meta.verbose_name_plural}: {imported} rows ({self.rate(imported, elapsed)})")
+
+    def rate(self, imported, elapsed):
+        return f"{imported / max(elapsed, 1e-9):.0f} rows/s"
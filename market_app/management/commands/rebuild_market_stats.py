@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from market_app.stats import rebuild_market_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the MarketStats summary row of every market from the product and seller tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_market_stats(batch_size=options["batch_size"])
+        self.stdout.write(f"Rebuilt stats for {rebuilt} markets.")
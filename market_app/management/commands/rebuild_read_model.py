@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from market_app import documents
+
+
+class Command(BaseCommand):
+    help = "Re-render the pre-serialized ProductDocument and SellerDocument rows from the catalog tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for model in documents.READ_MODELS:
+            rebuilt = documents.rebuild(model, batch_size=options["batch_size"])
+            self.stdout.write(f"{model._meta.verbose_name_plural}: rebuilt {rebuilt}")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from market_app.counters import repair_market_counts
+from market_app.models import Product, Seller
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized market_count of sellers and products and repair any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for model in (Seller, Product):
+            repaired = repair_market_counts(model, batch_size=options["batch_size"])
+            self.stdout.write(f"{model._meta.verbose_name_plural}: repaired {repaired}")
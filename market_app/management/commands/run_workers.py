@@ -0,0 +1,31 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from market_app import jobs
+
+
+class Command(BaseCommand):
+    help = "Drain the background job table with a pool of worker threads or processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--burst", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        if options["mode"] == "process":
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=options["workers"], initializer=django.setup)
+        else:
+            executor = ThreadPoolExecutor(max_workers=options["workers"], thread_name_prefix="job-worker")
+        with executor:
+            futures = [
+                executor.submit(jobs.work, options["burst"], options["poll_interval"])
+                for _ in range(options["workers"])
+            ]
+            processed = sum(future.result() for future in futures)
+        self.stdout.write(f"Processed {processed} jobs.")
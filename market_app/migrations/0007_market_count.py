@@ -0,0 +1,40 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:28
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def backfill_market_counts(apps, schema_editor):
+    for model_name in ("Seller", "Product"):
+        model = apps.get_model("market_app", model_name)
+        counts = model.objects.filter(pk=OuterRef("pk")).annotate(total=Count("markets")).values("total")
+        model.objects.update(market_count=Subquery(counts))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_app', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='market_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='seller',
+            name='market_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['market_count', 'id'], name='product_market_count_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seller',
+            index=models.Index(fields=['market_count', 'id'], name='seller_market_count_id_idx'),
+        ),
+        migrations.RunPython(backfill_market_counts, migrations.RunPython.noop),
+    ]
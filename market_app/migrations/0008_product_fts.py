@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from market_app.search import install_product_fts, uninstall_product_fts
+
+
+def install(apps, schema_editor):
+    install_product_fts(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_product_fts(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_app', '0007_market_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
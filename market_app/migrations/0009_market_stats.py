@@ -0,0 +1,55 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:50
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Avg, Count, Max, Min, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_market_stats(apps, schema_editor):
+    Market = apps.get_model("market_app", "Market")
+    MarketStats = apps.get_model("market_app", "MarketStats")
+    seller_through = Market.sellers.through
+    seller_counts = dict(
+        seller_through.objects.values("market_id").annotate(total=Count("seller_id")).values_list("market_id", "total")
+    )
+    rows = Market.objects.order_by("pk").values("id").annotate(
+        product_count=Count("products"),
+        min_price=Min("products__price"),
+        avg_price=Avg("products__price"),
+        max_price=Max("products__price"),
+        total_value=Coalesce(
+            Sum("products__price"), Value(Decimal("0")), output_field=models.DecimalField(max_digits=100, decimal_places=2)
+        ),
+    )
+    stats = []
+    for row in rows:
+        market_id = row.pop("id")
+        stats.append(MarketStats(market_id=market_id, seller_count=seller_counts.get(market_id, 0), **row))
+    MarketStats.objects.bulk_create(stats, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_app', '0008_product_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketStats',
+            fields=[
+                ('market', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='market_app.market')),
+                ('product_count', models.PositiveIntegerField(default=0)),
+                ('seller_count', models.PositiveIntegerField(default=0)),
+                ('min_price', models.DecimalField(decimal_places=2, max_digits=50, null=True)),
+                ('avg_price', models.DecimalField(decimal_places=2, max_digits=50, null=True)),
+                ('max_price', models.DecimalField(decimal_places=2, max_digits=50, null=True)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=100)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_market_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_app', '0009_market_stats'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX product_markets_market_product_idx ON market_app_product_markets (market_id, product_id)',
+            reverse_sql='DROP INDEX product_markets_market_product_idx',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX seller_markets_market_seller_idx ON market_app_seller_markets (market_id, seller_id)',
+            reverse_sql='DROP INDEX seller_markets_market_seller_idx',
+        ),
+    ]
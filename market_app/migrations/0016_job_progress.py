@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 06:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market_app", "0015_job_lease"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="progress",
+            field=models.JSONField(default=dict),
+        ),
+    ]
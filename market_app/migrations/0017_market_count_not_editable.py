@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 06:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market_app", "0016_job_progress"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="product",
+            name="market_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="seller",
+            name="market_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -6,26 +6,145 @@ class Market(models.Model):
     location = models.CharField(max_length=255)
     description = models.TextField()
     net_worth = models.DecimalField(max_digits=100, decimal_places=2)
+    external_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["name", "id"], name="market_name_id_idx")]
 
     def __str__(self):
         return self.name
 
 
-class Seller(models.Model):
+class MarketCountMixin:
+    def save(self, *args, **kwargs):
+        if kwargs.get("update_fields") is None and not self._state.adding:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "market_count" and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+class Seller(MarketCountMixin, models.Model):
     name = models.CharField(max_length=255)
     contact_info = models.TextField()
     markets = models.ManyToManyField(Market, related_name="sellers")
+    market_count = models.PositiveIntegerField(default=0, editable=False)
+    external_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["name", "id"], name="seller_name_id_idx"),
+            models.Index(fields=["market_count", "id"], name="seller_market_count_id_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Product(models.Model):
+class Product(MarketCountMixin, models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField()
     price = models.DecimalField(max_digits=50, decimal_places=2)
     markets = models.ManyToManyField(Market, related_name="products")
     seller = models.ForeignKey(Seller, on_delete=models.SET_NULL, null=True, related_name="products")
+    market_count = models.PositiveIntegerField(default=0, editable=False)
+    external_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["price", "id"], name="product_price_id_idx"),
+            models.Index(fields=["name", "id"], name="product_name_id_idx"),
+            models.Index(fields=["market_count", "id"], name="product_market_count_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.price:.2f})"
+
+
+class MarketStats(models.Model):
+    market = models.OneToOneField(Market, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    product_count = models.PositiveIntegerField(default=0)
+    seller_count = models.PositiveIntegerField(default=0)
+    min_price = models.DecimalField(max_digits=50, decimal_places=2, null=True)
+    avg_price = models.DecimalField(max_digits=50, decimal_places=2, null=True)
+    max_price = models.DecimalField(max_digits=50, decimal_places=2, null=True)
+    total_value = models.DecimalField(max_digits=100, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for {self.market_id}"
+
+
+class Job(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (RUNNING, "Running"), (SUCCEEDED, "Succeeded"), (FAILED, "Failed")]
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    progress = models.JSONField(default=dict)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"], name="job_status_id_idx")]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class ProductDocument(models.Model):
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name="document")
+    body = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Document for product {self.product_id}"
+
+
+class SellerDocument(models.Model):
+    seller = models.OneToOneField(Seller, on_delete=models.CASCADE, primary_key=True, related_name="document")
+    body = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Document for seller {self.seller_id}"
+
+
+class Change(models.Model):
+    UPSERT = "upsert"
+    DELETE = "delete"
+    ACTION_CHOICES = [(UPSERT, "Upsert"), (DELETE, "Delete")]
+
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, default=UPSERT)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["model", "object_id", "id"], name="change_object_id_idx")]
+
+    def __str__(self):
+        return f"#{self.pk} {self.action} {self.model} {self.object_id}"
+
+
+class ChangeHorizon(models.Model):
+    sequence = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Changes pruned through #{self.sequence}"
@@ -0,0 +1,114 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+DEFAULTS = {
+    "ALIASES": [],
+    "STICKY_SECONDS": 10,
+    "COOKIE_NAME": "primary_until",
+    "APP_LABELS": ["market_app"],
+}
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+read_database = ContextVar("read_database", default=None)
+
+
+def get_setting(name):
+    return getattr(settings, "API_REPLICAS", {}).get(name, DEFAULTS[name])
+
+
+@contextmanager
+def use_database(alias):
+    token = read_database.set(alias)
+    try:
+        yield
+    finally:
+        read_database.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in get_setting("APP_LABELS"):
+            return read_database.get()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_setting("ALIASES")}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_setting("ALIASES"):
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.aliases = get_setting("ALIASES")
+        self.sticky_seconds = get_setting("STICKY_SECONDS")
+        self.cookie_name = get_setting("COOKIE_NAME")
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.read_database = None
+        token = read_database.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_database.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        request.read_database = None
+        token = read_database.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_database.reset(token)
+        return self.finish(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None)
+        if (
+            self.aliases
+            and request.method in SAFE_METHODS
+            and getattr(view_class, "replica_reads", False)
+            and not self.is_sticky(request)
+        ):
+            request.read_database = random.choice(self.aliases)
+            read_database.set(request.read_database)
+
+    def is_sticky(self, request):
+        try:
+            return float(request.COOKIES[self.cookie_name]) > time.time()
+        except (KeyError, ValueError):
+            return False
+
+    def finish(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                self.cookie_name,
+                str(time.time() + self.sticky_seconds),
+                max_age=self.sticky_seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,65 @@
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "market_app_product_fts"
+FTS_TRIGGERS = ("market_app_product_fts_ai", "market_app_product_fts_ad", "market_app_product_fts_au")
+
+FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+        USING fts5(name, description, content='market_app_product', content_rowid='id')""",
+    f"""CREATE TRIGGER IF NOT EXISTS market_app_product_fts_ai AFTER INSERT ON market_app_product BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS market_app_product_fts_ad AFTER DELETE ON market_app_product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS market_app_product_fts_au AFTER UPDATE OF name, description
+        ON market_app_product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+
+def install_product_fts(connection):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s", [f"{FTS_TABLE}%"])
+        if {row[0] for row in cursor.fetchall()} >= set(FTS_TRIGGERS):
+            return
+        for statement in FTS_SCHEMA:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def uninstall_product_fts(connection):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for trigger in FTS_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def ensure_product_fts(sender, using="default", **kwargs):
+    install_product_fts(connections[using])
+
+
+def fts_query(terms):
+    return " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def search_products(queryset, query):
+    terms = query.split()
+    if not terms:
+        return queryset
+    if connections[queryset.db].vendor == "sqlite":
+        match = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (fts_query(terms),))
+        return queryset.filter(pk__in=match)
+    for term in terms:
+        queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+    return queryset
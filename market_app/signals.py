@@ -0,0 +1,200 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from . import cache, changes, documents, stats
+from .counters import recount_markets
+from .models import Change, Market, Product, Seller
+
+bulk_changed = Signal()
+
+
+def refresh_markets(model, instance, reverse, pks):
+    touch(model, pks)
+    recount_markets(model, pks)
+    if not reverse:
+        instance.market_count = model.objects.values_list("market_count", flat=True).get(pk=instance.pk)
+
+
+def touch(model, pks):
+    if pks:
+        model.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+def member_market_pks(model, pks):
+    column = f"{model._meta.model_name}_id"
+    return set(model.markets.through.objects.filter(**{f"{column}__in": pks}).values_list("market_id", flat=True))
+
+
+def refresh_stats(market_pks):
+    if stats.is_materialized():
+        stats.refresh_market_stats(market_pks)
+
+
+def changed_pks(instance, action, reverse, pk_set, related_name):
+    if action == "pre_clear" and reverse:
+        instance._cleared_pks = set(getattr(instance, related_name).values_list("pk", flat=True))
+    if not action.startswith("post_"):
+        return None
+    if not reverse:
+        return {instance.pk}
+    if action == "post_clear":
+        return getattr(instance, "_cleared_pks", set())
+    return pk_set
+
+
+@receiver(post_save, sender=Market)
+@receiver(post_delete, sender=Market)
+@receiver(post_save, sender=Seller)
+@receiver(post_delete, sender=Seller)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_cached_responses(sender, **kwargs):
+    cache.invalidate(sender)
+
+
+@receiver(m2m_changed, sender=Seller.markets.through)
+def seller_markets_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    pks = changed_pks(instance, action, reverse, pk_set, "sellers")
+    if pks is not None:
+        refresh_markets(Seller, instance, reverse, pks)
+        cache.invalidate(Seller)
+        documents.refresh_sellers(pks)
+        changes.record(Seller, pks)
+
+
+@receiver(m2m_changed, sender=Product.markets.through)
+def product_markets_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    pks = changed_pks(instance, action, reverse, pk_set, "products")
+    if pks is not None:
+        refresh_markets(Product, instance, reverse, pks)
+        cache.invalidate(Product)
+        documents.refresh_products(pks)
+        changes.record(Product, pks)
+
+
+@receiver(m2m_changed, sender=Seller.markets.through)
+@receiver(m2m_changed, sender=Product.markets.through)
+def market_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not stats.is_materialized():
+        return
+    if action == "pre_clear" and not reverse:
+        instance._cleared_market_pks = set(instance.markets.values_list("pk", flat=True))
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        refresh_stats({instance.pk})
+    elif action == "post_clear":
+        refresh_stats(getattr(instance, "_cleared_market_pks", set()))
+    else:
+        refresh_stats(pk_set)
+
+
+@receiver(post_save, sender=Market)
+def create_market_stats(sender, instance, created, **kwargs):
+    if created:
+        refresh_stats({instance.pk})
+
+
+@receiver(post_save, sender=Product)
+def refresh_product_market_stats(sender, instance, created, **kwargs):
+    if not created and stats.is_materialized():
+        refresh_stats(member_market_pks(Product, [instance.pk]))
+
+
+@receiver(pre_delete, sender=Product)
+@receiver(pre_delete, sender=Seller)
+def stash_member_market_pks(sender, instance, origin=None, **kwargs):
+    origin = instance if origin is None else origin
+    if stats.is_materialized() and "_stats_market_pks" not in vars(origin):
+        pks = origin.values("pk") if hasattr(origin, "values") else [instance.pk]
+        origin._stats_market_pks = member_market_pks(sender, pks)
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Seller)
+def refresh_member_market_stats(sender, instance, origin=None, **kwargs):
+    pks = vars(instance if origin is None else origin).pop("_stats_market_pks", None)
+    if pks is not None:
+        refresh_stats(pks)
+
+
+@receiver(pre_delete, sender=Market)
+def touch_market_members(sender, instance, **kwargs):
+    instance._seller_pks = list(instance.sellers.values_list("pk", flat=True))
+    instance._product_pks = list(instance.products.values_list("pk", flat=True))
+    touch(Seller, instance._seller_pks)
+    touch(Product, instance._product_pks)
+
+
+@receiver(post_delete, sender=Market)
+def recount_market_members(sender, instance, **kwargs):
+    recount_markets(Seller, getattr(instance, "_seller_pks", []))
+    recount_markets(Product, getattr(instance, "_product_pks", []))
+    documents.refresh_members(getattr(instance, "_seller_pks", []), getattr(instance, "_product_pks", []))
+    changes.record(Seller, getattr(instance, "_seller_pks", []))
+    changes.record(Product, getattr(instance, "_product_pks", []))
+
+
+@receiver(pre_delete, sender=Seller)
+def touch_seller_products(sender, instance, **kwargs):
+    instance._product_pks = list(instance.products.values_list("pk", flat=True))
+    touch(Product, instance._product_pks)
+
+
+@receiver(post_delete, sender=Seller)
+def refresh_detached_products(sender, instance, **kwargs):
+    documents.refresh_products(getattr(instance, "_product_pks", []))
+    changes.record(Product, getattr(instance, "_product_pks", []))
+
+
+@receiver(bulk_changed, sender=Market)
+def invalidate_bulk_markets(sender, pks, market_pks=None, refresh_documents=True, **kwargs):
+    cache.invalidate(Market)
+    refresh_stats(pks if market_pks is None else market_pks)
+    if refresh_documents:
+        documents.refresh_markets(pks)
+    changes.record(Market, pks)
+
+
+@receiver(bulk_changed, sender=Product)
+@receiver(bulk_changed, sender=Seller)
+def invalidate_bulk_members(sender, pks, market_pks=None, refresh_documents=True, **kwargs):
+    recount_markets(sender, pks)
+    cache.invalidate(sender)
+    if stats.is_materialized():
+        refresh_stats(member_market_pks(sender, pks) if market_pks is None else market_pks)
+    if refresh_documents:
+        refresh = documents.refresh_sellers if sender is Seller else documents.refresh_products
+        refresh(pks)
+    changes.record(sender, pks)
+
+
+@receiver(post_save, sender=Product)
+def refresh_product_document(sender, instance, **kwargs):
+    documents.refresh_products({instance.pk})
+
+
+@receiver(post_save, sender=Seller)
+def refresh_seller_document(sender, instance, **kwargs):
+    documents.refresh_sellers({instance.pk})
+
+
+@receiver(post_save, sender=Market)
+def refresh_market_documents(sender, instance, created, **kwargs):
+    if not created:
+        documents.refresh_markets({instance.pk})
+
+
+@receiver(post_save, sender=Market)
+@receiver(post_save, sender=Seller)
+@receiver(post_save, sender=Product)
+def record_upsert(sender, instance, **kwargs):
+    changes.record(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=Market)
+@receiver(post_delete, sender=Seller)
+@receiver(post_delete, sender=Product)
+def record_tombstone(sender, instance, **kwargs):
+    changes.record(sender, [instance.pk], Change.DELETE)
@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Avg, Count, DecimalField, Max, Min, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Market, MarketStats
+
+STAT_FIELDS = ("product_count", "seller_count", "min_price", "avg_price", "max_price", "total_value")
+
+
+def is_materialized():
+    return getattr(settings, "MARKET_STATS_MATERIALIZED", True)
+
+
+def aggregate_market_stats(markets, fields=("id",)):
+    seller_through = markets.model.sellers.through
+    rows = list(
+        markets.order_by("pk")
+        .values(*fields)
+        .annotate(
+            product_count=Count("products"),
+            min_price=Min("products__price"),
+            avg_price=Avg("products__price"),
+            max_price=Max("products__price"),
+            total_value=Coalesce(
+                Sum("products__price"), Value(Decimal("0")), output_field=DecimalField(max_digits=100, decimal_places=2)
+            ),
+        )
+    )
+    seller_counts = dict(
+        seller_through.objects.filter(market__in=markets.values("pk"))
+        .values("market_id")
+        .annotate(total=Count("seller_id"))
+        .values_list("market_id", "total")
+    )
+    for row in rows:
+        row["seller_count"] = seller_counts.get(row["id"], 0)
+    return rows
+
+
+def refresh_market_stats(market_pks):
+    if not market_pks:
+        return
+    markets = Market.objects.filter(pk__in=list(market_pks))
+    now = timezone.now()
+    MarketStats.objects.bulk_create(
+        [
+            MarketStats(market_id=row["id"], updated_at=now, **{field: row[field] for field in STAT_FIELDS})
+            for row in aggregate_market_stats(markets)
+        ],
+        update_conflicts=True,
+        unique_fields=["market"],
+        update_fields=[*STAT_FIELDS, "updated_at"],
+    )
+
+
+def rebuild_market_stats(batch_size=1000):
+    rebuilt = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            Market.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:batch_size]
+        )
+        if not pks:
+            return rebuilt
+        last_pk = pks[-1]
+        refresh_market_stats(pks)
+        rebuilt += len(pks)
+
+
+def market_stats(markets):
+    fields = ("id", "name", "net_worth")
+    if not is_materialized():
+        return aggregate_market_stats(markets, fields)
+    rows = list(markets.order_by("pk").values(*fields, *(f"stats__{field}" for field in STAT_FIELDS)))
+    for row in rows:
+        for field in STAT_FIELDS:
+            row[field] = row.pop(f"stats__{field}")
+    missing = [row["id"] for row in rows if row["product_count"] is None]
+    if missing:
+        live = {row["id"]: row for row in aggregate_market_stats(markets.filter(pk__in=missing), fields)}
+        rows = [live.get(row["id"], row) for row in rows]
+    return rows
@@ -1,6 +1,19 @@
+import json
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 from rest_framework import status
-from market_app.models import Market, Seller, Product
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.throttling import AnonRateThrottle
+from market_app import jobs
+from market_app.api.async_views import AsyncReadView
+from market_app.api.pagination import KeysetPagination
+from market_app.models import Job, Market, MarketStats, Seller, Product
 
 
 class MarketAPITestCase(APITestCase):
@@ -273,3 +286,807 @@ class ProductAPITestCase(APITestCase):
     def test_product_not_found(self):
         response = self.client.get("/api/products/999/")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class QueryCountTestCase(APITestCase):
+    def setUp(self):
+        self.markets = [
+            Market.objects.create(name=f"Market {i}", location="Berlin", description="Test", net_worth="1000.00")
+            for i in range(3)
+        ]
+
+    def create_products(self, count):
+        for i in range(count):
+            seller = Seller.objects.create(name=f"Seller {i}", contact_info="seller@example.com")
+            seller.markets.set(self.markets)
+            product = Product.objects.create(name=f"Product {i}", description="Test", price="1.00", seller=seller)
+            product.markets.set(self.markets[: i % 3 + 1])
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response
+
+    def test_product_list_query_count_is_constant(self):
+        self.create_products(2)
+        small, _ = self.count_queries("/api/products/")
+        self.create_products(10)
+        large, response = self.count_queries("/api/products/")
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data), 12)
+
+    def test_seller_list_query_count_is_constant(self):
+        self.create_products(2)
+        small, _ = self.count_queries("/api/sellers/")
+        self.create_products(10)
+        large, _ = self.count_queries("/api/sellers/")
+        self.assertEqual(small, large)
+
+    def test_market_count_matches_markets(self):
+        self.create_products(3)
+        _, response = self.count_queries("/api/products/")
+        for item in response.data:
+            self.assertEqual(item["market_count"], len(item["markets"]))
+            self.assertEqual(item["seller"]["market_count"], 3)
+
+    def test_product_detail_query_count(self):
+        self.create_products(1)
+        product = Product.objects.get()
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/products/{product.id}/")
+        self.assertEqual(response.data["market_count"], 1)
+
+
+class KeysetPaginationTestCase(APITestCase):
+    def setUp(self):
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        for i in range(7):
+            Product.objects.create(
+                name=f"Product {6 - i}", description="Test", price=f"{i % 3}.50", seller=self.seller
+            )
+
+    def collect(self, url):
+        items = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 3)
+            items.extend(response.data["results"])
+            url = response.data["next"]
+        return items
+
+    def test_unpaginated_by_default(self):
+        response = self.client.get("/api/products/")
+        self.assertEqual(len(response.data), 7)
+
+    def test_paginate_by_id(self):
+        items = self.collect("/api/products/?page_size=3")
+        ids = list(Product.objects.order_by("id").values_list("id", flat=True))
+        self.assertEqual([item["id"] for item in items], ids)
+
+    def test_paginate_by_price_with_ties(self):
+        items = self.collect("/api/products/?page_size=3&ordering=price")
+        expected = list(Product.objects.order_by("price", "id").values_list("id", flat=True))
+        self.assertEqual([item["id"] for item in items], expected)
+
+    def test_paginate_by_name_descending(self):
+        items = self.collect("/api/products/?page_size=3&ordering=-name")
+        expected = list(Product.objects.order_by("-name", "-id").values_list("id", flat=True))
+        self.assertEqual([item["id"] for item in items], expected)
+
+    def test_paginate_markets_by_name(self):
+        for name in ["B", "A", "C"]:
+            Market.objects.create(name=name, location="Berlin", description="Test", net_worth="1.00")
+        response = self.client.get("/api/markets/?page_size=2&ordering=name")
+        self.assertEqual([item["name"] for item in response.data["results"]], ["A", "B"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([item["name"] for item in response.data["results"]], ["C"])
+        self.assertIsNone(response.data["next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/products/?cursor=garbage")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("cursor", response.data)
+
+    def test_invalid_ordering(self):
+        response = self.client.get("/api/sellers/?page_size=3&ordering=price")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ordering", response.data)
+
+    def test_invalid_page_size(self):
+        for page_size in ("abc", "0", "-1", "1.5", ""):
+            with self.subTest(page_size=page_size):
+                response = self.client.get(f"/api/products/?page_size={page_size}")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("page_size", response.data)
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(KeysetPagination, "max_page_size", 5):
+            response = self.client.get("/api/products/?page_size=50")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertTrue(response.data["next"].endswith("page_size=5"))
+
+
+class ProductExportTestCase(APITestCase):
+    def setUp(self):
+        self.market = Market.objects.create(
+            name="Downtown Market", location="Munich", description="Test", net_worth="1200000.50"
+        )
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        self.seller.markets.add(self.market)
+        for i in range(5):
+            product = Product.objects.create(name=f"Product {i}", description="Test", price="3.50", seller=self.seller)
+            product.markets.add(self.market)
+
+    def test_export_json(self):
+        response = self.client.get("/api/products/export/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        data = json.loads(b"".join(response.streaming_content))
+        expected = json.loads(json.dumps(self.client.get("/api/products/").data))
+        self.assertEqual(data, expected)
+
+    def test_export_ndjson(self):
+        response = self.client.get("/api/products/export/?format=ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[0])["seller"]["name"], "John Doe")
+
+    def test_export_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as small:
+            b"".join(self.client.get("/api/products/export/").streaming_content)
+        for i in range(10):
+            Product.objects.create(name=f"Extra {i}", description="Test", price="1.00", seller=self.seller)
+        with CaptureQueriesContext(connection) as large:
+            b"".join(self.client.get("/api/products/export/").streaming_content)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        self.market = Market.objects.create(
+            name="Downtown Market", location="Munich", description="Test", net_worth="1200000.50"
+        )
+        self.other_market = Market.objects.create(
+            name="Green Valley Market", location="Hamburg", description="Test", net_worth="750000.75"
+        )
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        self.seller.markets.add(self.market)
+        self.product = Product.objects.create(name="Apples", description="Test", price="3.50", seller=self.seller)
+        self.product.markets.add(self.market)
+
+    def assertNotModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_not_modified(self):
+        response = self.client.get("/api/products/")
+        self.assertIn("Last-Modified", response)
+        with self.assertNumQueries(3):
+            self.assertNotModified("/api/products/", response["ETag"])
+
+    def test_detail_not_modified(self):
+        url = f"/api/products/{self.product.id}/"
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(1):
+            self.assertNotModified(url, etag)
+
+    def test_if_modified_since(self):
+        url = f"/api/markets/{self.market.id}/"
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=self.client.get(url)["Last-Modified"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_update_changes_etag(self):
+        url = f"/api/products/{self.product.id}/"
+        etag = self.client.get(url)["ETag"]
+        list_etag = self.client.get("/api/products/")["ETag"]
+        self.client.patch(url, {"name": "Pears"}, format="json")
+        self.assertModified(url, etag)
+        self.assertModified("/api/products/", list_etag)
+
+    def test_markets_change_changes_etag(self):
+        url = f"/api/products/{self.product.id}/"
+        etag = self.client.get(url)["ETag"]
+        previous = Product.objects.get(pk=self.product.pk).updated_at
+        self.other_market.products.add(self.product)
+        self.assertGreater(Product.objects.get(pk=self.product.pk).updated_at, previous)
+        self.assertModified(url, etag)
+
+    def test_seller_markets_change_changes_product_etag(self):
+        url = f"/api/products/{self.product.id}/"
+        etag = self.client.get(url)["ETag"]
+        self.seller.markets.clear()
+        self.assertModified(url, etag)
+
+    def test_market_delete_changes_seller_etag(self):
+        url = f"/api/sellers/{self.seller.id}/"
+        etag = self.client.get(url)["ETag"]
+        self.market.delete()
+        self.assertModified(url, etag)
+
+    def test_missing_object(self):
+        response = self.client.get("/api/products/999/", HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_etag_depends_on_query(self):
+        etag = self.client.get("/api/products/")["ETag"]
+        for url in (
+            "/api/products/?min_price=5",
+            "/api/products/?fields=id",
+            "/api/products/?expand=seller",
+            "/api/products/?ordering=-price",
+            "/api/products/?page_size=1",
+        ):
+            with self.subTest(url=url):
+                self.assertModified(url, etag)
+                self.assertNotModified(url, self.client.get(url)["ETag"])
+        etag = self.client.get("/api/products/?fields=id,name&min_price=1")["ETag"]
+        self.assertNotModified("/api/products/?min_price=1&fields=id,name", etag)
+
+    def test_nested_etag_depends_on_parent(self):
+        etag = self.client.get(f"/api/markets/{self.market.id}/products/")["ETag"]
+        self.assertModified(f"/api/markets/{self.other_market.id}/products/", etag)
+
+    def test_nested_missing_parent(self):
+        url = f"/api/markets/{self.other_market.id}/products/"
+        last_modified = self.client.get(url)["Last-Modified"]
+        self.other_market.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ProductBulkAPITestCase(APITestCase):
+    def setUp(self):
+        self.markets = [
+            Market.objects.create(name=f"Market {i}", location="Berlin", description="Test", net_worth="1000.00")
+            for i in range(3)
+        ]
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+
+    def item(self, index, **overrides):
+        data = {
+            "name": f"Product {index}",
+            "description": "Imported product.",
+            "price": "2.50",
+            "markets_ids": [market.id for market in self.markets[: index % 3 + 1]],
+            "seller_id": self.seller.id,
+        }
+        data.update(overrides)
+        return data
+
+    def test_bulk_create(self):
+        items = [self.item(i) for i in range(20)]
+        with CaptureQueriesContext(connection) as small:
+            self.client.post("/api/products/bulk/", items[:2], format="json")
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post("/api/products/bulk/", items[2:], format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["created"]), 18)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        product = Product.objects.get(pk=response.data["created"][0])
+        self.assertEqual(product.seller, self.seller)
+        self.assertEqual(product.markets.count(), 3)
+        self.assertEqual(self.client.get(f"/api/products/{product.id}/").data["market_count"], 3)
+
+    def test_bulk_create_reports_item_errors(self):
+        items = [self.item(0), self.item(1, markets_ids=[self.markets[0].id, 999]), self.item(2, price="-1.00")]
+        response = self.client.post("/api/products/bulk/", items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("price", response.data[2])
+        self.assertFalse(Product.objects.exists())
+
+        response = self.client.post("/api/products/bulk/", items[:2] + [self.item(3, seller_id=999)], format="json")
+        self.assertEqual(response.data[1], {"markets_ids": ['Invalid pk "999" - object does not exist.']})
+        self.assertIn("seller_id", response.data[2])
+        self.assertFalse(Product.objects.exists())
+
+    def test_bulk_create_requires_list(self):
+        response = self.client.post("/api/products/bulk/", self.item(0), format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update(self):
+        ids = self.client.post("/api/products/bulk/", [self.item(i) for i in range(3)], format="json").data["created"]
+        items = [{"id": ids[0], "price": "9.99"}, {"id": ids[1], "markets_ids": [self.markets[2].id]}]
+        response = self.client.patch("/api/products/bulk/", items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(str(Product.objects.get(pk=ids[0]).price), "9.99")
+        self.assertEqual(list(Product.objects.get(pk=ids[1]).markets.all()), [self.markets[2]])
+        self.assertEqual(Product.objects.get(pk=ids[2]).markets.count(), 3)
+
+    def test_bulk_update_refreshes_stats_of_previous_markets(self):
+        ids = self.client.post("/api/products/bulk/", [self.item(0)], format="json").data["created"]
+        self.assertEqual(MarketStats.objects.get(market=self.markets[0]).product_count, 1)
+        items = [{"id": ids[0], "markets_ids": [self.markets[1].id]}]
+        self.client.patch("/api/products/bulk/", items, format="json")
+        self.assertEqual(MarketStats.objects.get(market=self.markets[0]).product_count, 0)
+        self.assertEqual(MarketStats.objects.get(market=self.markets[1]).product_count, 1)
+
+    def test_bulk_update_errors(self):
+        ids = self.client.post("/api/products/bulk/", [self.item(0)], format="json").data["created"]
+        response = self.client.patch("/api/products/bulk/", [{"price": "1.00"}, {"id": 999}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("id", response.data[0])
+        response = self.client.patch("/api/products/bulk/", [{"id": ids[0]}, {"id": 999}], format="json")
+        self.assertEqual(response.data[1], {"id": ['Invalid pk "999" - object does not exist.']})
+
+    def test_bulk_delete(self):
+        ids = self.client.post("/api/products/bulk/", [self.item(i) for i in range(3)], format="json").data["created"]
+        response = self.client.delete("/api/products/bulk/", {"ids": ids[:2] + [999]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Product.objects.count(), 3)
+        response = self.client.delete("/api/products/bulk/", {"ids": ids[:2]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(Product.objects.values_list("id", flat=True)), ids[2:])
+
+
+class ProductFilterTestCase(APITestCase):
+    def setUp(self):
+        self.markets = [
+            Market.objects.create(name=f"Market {i}", location="Berlin", description="Test", net_worth="1000.00")
+            for i in range(2)
+        ]
+        self.sellers = [Seller.objects.create(name=f"Seller {i}", contact_info="seller@example.com") for i in range(2)]
+        self.apples = Product.objects.create(
+            name="Organic Apples", description="Fresh apples from local farms.", price="3.50", seller=self.sellers[0]
+        )
+        self.apples.markets.set(self.markets)
+        self.baskets = Product.objects.create(
+            name="Handmade Baskets", description="Woven from willow.", price="15.00", seller=self.sellers[1]
+        )
+        self.baskets.markets.set(self.markets[:1])
+        self.juice = Product.objects.create(
+            name="Apple Juice", description="Pressed daily.", price="4.20", seller=self.sellers[1]
+        )
+
+    def ids(self, query):
+        response = self.client.get(f"/api/products/?{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["id"] for item in response.data]
+
+    def test_price_range(self):
+        self.assertEqual(sorted(self.ids("min_price=4&max_price=15")), [self.baskets.id, self.juice.id])
+
+    def test_seller_and_market(self):
+        self.assertEqual(sorted(self.ids(f"seller_id={self.sellers[1].id}")), [self.baskets.id, self.juice.id])
+        self.assertEqual(self.ids(f"market_id={self.markets[1].id}"), [self.apples.id])
+
+    def test_search(self):
+        self.assertEqual(sorted(self.ids("search=appl")), [self.apples.id, self.juice.id])
+        self.assertEqual(self.ids("search=willow"), [self.baskets.id])
+        self.assertEqual(self.ids("search=apple%20pressed"), [self.juice.id])
+        self.assertEqual(self.ids('search="'), [])
+
+    def test_search_index_follows_writes(self):
+        self.client.patch(f"/api/products/{self.baskets.id}/", {"name": "Willow Crates"}, format="json")
+        self.assertEqual(self.ids("search=crates"), [self.baskets.id])
+        self.assertEqual(self.ids("search=handmade"), [])
+        self.juice.delete()
+        self.assertEqual(self.ids("search=apple"), [self.apples.id])
+
+    def test_ordering(self):
+        self.assertEqual(self.ids("ordering=-price"), [self.baskets.id, self.juice.id, self.apples.id])
+        self.assertEqual(self.ids("ordering=-market_count"), [self.apples.id, self.baskets.id, self.juice.id])
+
+    def test_market_count(self):
+        self.assertEqual(self.ids("min_market_count=1&ordering=market_count"), [self.baskets.id, self.apples.id])
+        self.assertEqual(self.ids("max_market_count=1&ordering=-market_count"), [self.baskets.id, self.juice.id])
+        self.assertEqual(self.ids("min_market_count=2&max_market_count=2"), [self.apples.id])
+
+    def test_seller_market_count(self):
+        self.sellers[0].markets.set(self.markets)
+        self.sellers[1].markets.set(self.markets[:1])
+        response = self.client.get("/api/sellers/?min_market_count=2")
+        self.assertEqual([item["id"] for item in response.data], [self.sellers[0].id])
+        response = self.client.get("/api/sellers/?max_market_count=1&ordering=-market_count&page_size=1")
+        self.assertEqual([item["id"] for item in response.data["results"]], [self.sellers[1].id])
+
+    def test_filters_with_pagination(self):
+        response = self.client.get("/api/products/?search=apple&ordering=price&page_size=1")
+        self.assertEqual([item["id"] for item in response.data["results"]], [self.apples.id])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([item["id"] for item in response.data["results"]], [self.juice.id])
+        self.assertIsNone(response.data["next"])
+
+    def test_invalid_filter(self):
+        response = self.client.get("/api/products/?min_price=cheap")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("min_price", response.data)
+        for url in ("/api/products/?min_market_count=-1", "/api/sellers/?max_market_count=many"):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SparseFieldsetTestCase(APITestCase):
+    def setUp(self):
+        self.markets = [
+            Market.objects.create(name=f"Market {i}", location="Berlin", description="Test", net_worth="1000.00")
+            for i in range(2)
+        ]
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        self.seller.markets.set(self.markets)
+        self.product = Product.objects.create(name="Apples", description="Test", price="3.50", seller=self.seller)
+        self.product.markets.set(self.markets[:1])
+        self.market_ids = [market.id for market in self.markets]
+
+    def get(self, url, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_default_is_fully_nested(self):
+        data = self.get("/api/products/", 4)[0]
+        self.assertEqual(data["seller"]["markets"][0]["name"], "Market 0")
+
+    def test_fields(self):
+        data = self.get("/api/products/?fields=id,name,price", 4)
+        self.assertEqual(data, [{"id": self.product.id, "name": "Apples", "price": "3.50"}])
+
+    def test_expand_defaults_to_flat_ids(self):
+        data = self.get("/api/products/?expand=", 5)[0]
+        self.assertEqual(data["seller"], self.seller.id)
+        self.assertEqual(data["markets"], [self.markets[0].id])
+
+    def test_expand_seller(self):
+        data = self.get("/api/products/?expand=seller", 6)[0]
+        self.assertEqual(data["seller"]["name"], "John Doe")
+        self.assertEqual(data["seller"]["markets"], self.market_ids)
+        self.assertEqual(data["markets"], [self.markets[0].id])
+
+    def test_expand_nested_markets(self):
+        data = self.get("/api/products/?expand=seller,seller.markets,markets&fields=seller,markets", 7)[0]
+        self.assertEqual(set(data), {"seller", "markets"})
+        self.assertEqual(data["seller"]["markets"][1]["name"], "Market 1")
+        self.assertEqual(data["markets"][0]["name"], "Market 0")
+
+    def test_seller_fields_and_expand(self):
+        data = self.get(f"/api/sellers/{self.seller.id}/?fields=id,markets&expand=", 3)
+        self.assertEqual(data, {"id": self.seller.id, "markets": self.market_ids})
+
+    def test_fields_with_ordering(self):
+        data = self.get("/api/products/?fields=id&ordering=price&page_size=1", 4)
+        self.assertEqual(data["results"], [{"id": self.product.id}])
+
+    def test_fields_do_not_affect_writes(self):
+        response = self.client.post(
+            "/api/products/?fields=id",
+            {"name": "Pears", "description": "Test", "price": "1.00", "markets_ids": [], "seller_id": self.seller.id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["name"], "Pears")
+
+
+class OncePerMinuteThrottle(AnonRateThrottle):
+    rate = "1/minute"
+
+
+class AsyncReadViewTestCase(TestCase):
+    def setUp(self):
+        self.markets = [
+            Market.objects.create(name=f"Market {i}", location="Berlin", description="Test", net_worth="1000.50")
+            for i in range(2)
+        ]
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        self.seller.markets.set(self.markets)
+        for i in range(3):
+            product = Product.objects.create(
+                name=f"Apples {i}", description="Test", price=f"{i + 1}.50", seller=self.seller
+            )
+            product.markets.set(self.markets[: i % 2 + 1])
+        self.product = product
+
+    async def assertSameAsSync(self, path):
+        sync = await self.async_client.get(f"/api/{path}")
+        response = await self.async_client.get(f"/api/async/{path}")
+        self.assertEqual(response.status_code, sync.status_code)
+        data, expected = json.loads(response.content), json.loads(sync.content)
+        if isinstance(expected, dict) and expected.get("next"):
+            expected["next"] = expected["next"].replace("/api/", "/api/async/")
+        self.assertEqual(data, expected)
+        return data
+
+    async def test_lists_match_sync_views(self):
+        for path in (
+            "markets/",
+            "sellers/?expand=",
+            "products/",
+            "products/?expand=seller,seller.markets&fields=id,seller",
+            "products/?ordering=-price&page_size=2",
+            "products/?min_price=2&search=apples",
+        ):
+            with self.subTest(path=path):
+                await self.assertSameAsSync(path)
+
+    async def test_details_match_sync_views(self):
+        await self.assertSameAsSync(f"markets/{self.markets[0].id}/")
+        await self.assertSameAsSync(f"sellers/{self.seller.id}/")
+        await self.assertSameAsSync(f"products/{self.product.id}/?expand=seller")
+
+    async def test_pagination_follows_cursor(self):
+        data = await self.assertSameAsSync("products/?page_size=2")
+        response = await self.async_client.get(data["next"])
+        page = json.loads(response.content)
+        self.assertIsNone(page["next"])
+        self.assertEqual([item["id"] for item in page["results"]], [self.product.id])
+
+    async def test_errors(self):
+        for path in ("products/999999/", "products/?ordering=bogus", "products/?min_price=cheap"):
+            with self.subTest(path=path):
+                await self.assertSameAsSync(path)
+
+    async def test_writes_are_not_allowed(self):
+        response = await self.async_client.post("/api/async/markets/", {"name": "Nope"})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_permissions_apply(self):
+        with mock.patch.object(AsyncReadView, "permission_classes", [IsAuthenticated]):
+            for path in ("markets/", f"products/{self.product.id}/"):
+                with self.subTest(path=path):
+                    response = await self.async_client.get(f"/api/async/{path}")
+                    self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            await self.async_client.aforce_login(await User.objects.acreate(username="buyer"))
+            response = await self.async_client.get("/api/async/markets/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    async def test_throttles_apply(self):
+        cache.clear()
+        with mock.patch.object(AsyncReadView, "throttle_classes", [OncePerMinuteThrottle]):
+            first = await self.async_client.get("/api/async/markets/")
+            second = await self.async_client.get("/api/async/markets/")
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", second)
+
+
+class MarketStatsAPITestCase(APITestCase):
+    def setUp(self):
+        self.markets = [
+            Market.objects.create(name=f"Market {i}", location="Berlin", description="Test", net_worth=net_worth)
+            for i, net_worth in enumerate(["100.00", "0.00"])
+        ]
+        seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        seller.markets.set(self.markets)
+        for price in ("1.00", "2.50", "6.00"):
+            Product.objects.create(name="Apples", description="Test", price=price).markets.add(self.markets[0])
+
+    def test_stats(self):
+        response = self.client.get("/api/markets/stats/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data[0],
+            {
+                "id": self.markets[0].id,
+                "name": "Market 0",
+                "net_worth": "100.00",
+                "product_count": 3,
+                "seller_count": 1,
+                "min_price": "1.00",
+                "avg_price": "3.17",
+                "max_price": "6.00",
+                "total_value": "9.50",
+                "net_worth_share": 0.095,
+            },
+        )
+        self.assertEqual(response.data[1]["product_count"], 0)
+        self.assertIsNone(response.data[1]["min_price"])
+        self.assertIsNone(response.data[1]["net_worth_share"])
+
+    def test_live_and_materialized_agree(self):
+        materialized = self.client.get("/api/markets/stats/").data
+        with self.settings(MARKET_STATS_MATERIALIZED=False):
+            with self.assertNumQueries(2):
+                live = self.client.get("/api/markets/stats/").data
+        self.assertEqual(live, materialized)
+
+    def test_markets_without_summary_fall_back_to_live(self):
+        MarketStats.objects.filter(market=self.markets[0]).delete()
+        response = self.client.get(f"/api/markets/{self.markets[0].id}/stats/")
+        self.assertEqual(response.data["product_count"], 3)
+
+    def test_single_market(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/markets/{self.markets[0].id}/stats/")
+        self.assertEqual(response.data["total_value"], "9.50")
+        response = self.client.get("/api/markets/999999/stats/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class NestedListTestCase(APITestCase):
+    def setUp(self):
+        self.markets = [
+            Market.objects.create(name=f"Market {i}", location="Berlin", description="Test", net_worth="1000.00")
+            for i in range(2)
+        ]
+        self.sellers = [Seller.objects.create(name=f"Seller {i}", contact_info="seller@example.com") for i in range(2)]
+        self.sellers[0].markets.set(self.markets)
+        self.sellers[1].markets.set(self.markets[1:])
+        self.products = []
+        for i in range(5):
+            product = Product.objects.create(
+                name=f"Product {i}", description="Test", price=f"{i + 1}.00", seller=self.sellers[i % 2]
+            )
+            product.markets.set(self.markets[: 1 + i % 2])
+            self.products.append(product)
+
+    def ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["id"] for item in response.data]
+
+    def test_market_products(self):
+        market = self.markets[1]
+        self.assertEqual(self.ids(f"/api/markets/{market.id}/products/"), [self.products[1].id, self.products[3].id])
+        self.assertEqual(len(self.ids(f"/api/markets/{self.markets[0].id}/products/")), 5)
+
+    def test_market_sellers(self):
+        self.assertEqual(self.ids(f"/api/markets/{self.markets[0].id}/sellers/"), [self.sellers[0].id])
+        self.assertEqual(len(self.ids(f"/api/markets/{self.markets[1].id}/sellers/")), 2)
+
+    def test_seller_products(self):
+        ids = self.ids(f"/api/sellers/{self.sellers[1].id}/products/?ordering=-price")
+        self.assertEqual(ids, [self.products[3].id, self.products[1].id])
+
+    def test_pagination_returns_slice(self):
+        url = f"/api/markets/{self.markets[0].id}/products/?page_size=2"
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            seen += [item["id"] for item in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(seen, [product.id for product in self.products])
+
+    def test_query_count_is_constant(self):
+        url = f"/api/markets/{self.markets[0].id}/products/?page_size=2"
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+        for i in range(20):
+            Product.objects.create(name=f"Extra {i}", description="Test", price="1.00").markets.add(self.markets[0])
+        with self.assertNumQueries(len(small)):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_missing_parent(self):
+        for url in ("/api/markets/999999/products/", "/api/markets/999999/sellers/", "/api/sellers/999999/products/"):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_read_only(self):
+        response = self.client.post(f"/api/markets/{self.markets[0].id}/products/", {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class MarketMembershipAPITestCase(APITestCase):
+    def setUp(self):
+        self.markets = [
+            Market.objects.create(name=f"Market {i}", location="Berlin", description="Test", net_worth="1000.00")
+            for i in range(3)
+        ]
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        self.seller.markets.set(self.markets[:1])
+        self.product = Product.objects.create(name="Apples", description="Test", price="3.50", seller=self.seller)
+        self.product.markets.set(self.markets[:2])
+
+    def post(self, url, data):
+        return self.client.post(url, data, format="json")
+
+    def test_product_delta(self):
+        url = f"/api/products/{self.product.id}/markets/"
+        response = self.post(url, {"add": [self.markets[2].id], "remove": [self.markets[0].id]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"id": self.product.id, "market_count": 2})
+        self.assertEqual(
+            sorted(self.product.markets.values_list("id", flat=True)), [self.markets[1].id, self.markets[2].id]
+        )
+
+    def test_seller_delta(self):
+        url = f"/api/sellers/{self.seller.id}/markets/"
+        response = self.post(url, {"add": [market.id for market in self.markets]})
+        self.assertEqual(response.data["market_count"], 3)
+        response = self.post(url, {"remove": [self.markets[1].id, 999]})
+        self.assertEqual(response.data["market_count"], 2)
+
+    def test_adding_existing_membership_is_a_no_op(self):
+        response = self.post(f"/api/products/{self.product.id}/markets/", {"add": [self.markets[0].id]})
+        self.assertEqual(response.data["market_count"], 2)
+        self.assertEqual(self.product.markets.count(), 2)
+
+    def test_query_count_is_independent_of_membership_size(self):
+        url = f"/api/products/{self.product.id}/markets/"
+        with CaptureQueriesContext(connection) as small:
+            self.post(url, {"add": [self.markets[2].id], "remove": [self.markets[0].id]})
+        for i in range(20):
+            self.product.markets.add(
+                Market.objects.create(name=f"Extra {i}", location="Berlin", description="Test", net_worth="1.00")
+            )
+        with self.assertNumQueries(len(small)):
+            response = self.post(url, {"add": [self.markets[0].id], "remove": [self.markets[2].id]})
+        self.assertEqual(response.data["market_count"], 22)
+
+    def test_updates_stats_and_cached_detail(self):
+        detail = self.client.get(f"/api/products/{self.product.id}/").data
+        self.assertEqual(len(detail["markets"]), 2)
+        self.post(f"/api/products/{self.product.id}/markets/", {"remove": [self.markets[1].id]})
+        self.assertEqual(len(self.client.get(f"/api/products/{self.product.id}/").data["markets"]), 1)
+        self.assertEqual(MarketStats.objects.get(market=self.markets[1]).product_count, 0)
+
+    def test_errors(self):
+        url = f"/api/products/{self.product.id}/markets/"
+        self.assertEqual(self.post(url, {}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.post(url, {"add": [999]})
+        self.assertIn("add", response.data)
+        response = self.post(url, {"add": [self.markets[0].id], "remove": [self.markets[0].id]})
+        self.assertIn("remove", response.data)
+        self.assertEqual(self.post("/api/products/999/markets/", {"add": []}).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class JobAPITestCase(APITestCase):
+    def setUp(self):
+        self.market = Market.objects.create(name="Market", location="Berlin", description="Test", net_worth="100.00")
+        self.other = Market.objects.create(name="Other", location="Berlin", description="Test", net_worth="100.00")
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        self.products = [
+            Product.objects.create(name=f"Product {i}", description="Test", price=price, seller=self.seller)
+            for i, price in enumerate(["10.00", "3.33", "8.00"])
+        ]
+        for product in self.products[:2]:
+            product.markets.set([self.market, self.other])
+
+    def test_reprice_runs_in_background(self):
+        response = self.client.post(f"/api/markets/{self.market.id}/reprice/", {"percent": "10"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], Job.QUEUED)
+        self.assertEqual(response["Location"], f"/api/jobs/{response.data['id']}/")
+        self.assertEqual(Product.objects.get(pk=self.products[0].pk).price, Decimal("10.00"))
+
+        self.assertEqual(jobs.run_pending(), 1)
+        job = self.client.get(response["Location"]).data
+        self.assertEqual(job["status"], Job.SUCCEEDED)
+        self.assertEqual(job["result"], {"market": self.market.id, "updated": 2})
+        prices = [Product.objects.get(pk=product.pk).price for product in self.products]
+        self.assertEqual(prices, [Decimal("11.00"), Decimal("3.66"), Decimal("8.00")])
+        self.assertEqual(MarketStats.objects.get(market=self.other).total_value, Decimal("14.66"))
+
+    def test_reprice_errors(self):
+        url = f"/api/markets/{self.market.id}/reprice/"
+        self.assertEqual(self.client.post(url, {"percent": "-100"}, format="json").status_code, 400)
+        self.assertEqual(self.client.post(url, {}, format="json").status_code, 400)
+        response = self.client.post("/api/markets/999999/reprice/", {"percent": "5"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Job.objects.exists())
+
+    def test_async_seller_delete(self):
+        response = self.client.delete(f"/api/sellers/{self.seller.id}/", headers={"Prefer": "respond-async"})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response["Preference-Applied"], "respond-async")
+        self.assertTrue(Seller.objects.filter(pk=self.seller.pk).exists())
+        jobs.run_pending()
+        self.assertFalse(Seller.objects.filter(pk=self.seller.pk).exists())
+        self.assertFalse(Product.objects.filter(seller__isnull=False).exists())
+        job = self.client.get(response["Location"]).data
+        self.assertEqual(job["result"], {"seller": self.seller.id, "deleted": True, "detached_products": 3})
+
+    def test_failed_job(self):
+        job = jobs.enqueue("reprice_market", market_id=self.market.id, percent="cheap")
+        jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn("InvalidOperation", job.error)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_job_list(self):
+        jobs.enqueue("reprice_market", market_id=self.market.id, percent="1")
+        jobs.enqueue("delete_seller", seller_id=self.seller.id)
+        jobs.run_pending(limit=1)
+        response = self.client.get("/api/jobs/?status=queued")
+        self.assertEqual([job["kind"] for job in response.data], ["delete_seller"])
+        self.assertEqual(self.client.get("/api/jobs/999999/").status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,75 @@
+import base64
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework import status
+from market_app.models import Market
+from supermarket.handlers import APIModeWSGIApplication, APIWSGIHandler
+
+
+class SettingsRecordingMiddleware:
+    seen = []
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.seen.append(list(settings.MIDDLEWARE))
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+
+class APIModeHandlerTestCase(TestCase):
+    def setUp(self):
+        self.market = Market.objects.create(name="Market", location="Berlin", description="Test", net_worth="1.00")
+        self.factory = RequestFactory()
+
+    def test_lean_middleware_chain(self):
+        response = APIWSGIHandler().get_response(self.factory.get(f"/api/markets/{self.market.id}/"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["name"], "Market")
+        self.assertNotIn("X-Frame-Options", response)
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+
+    def test_middleware_chain_leaves_settings_alone(self):
+        middleware = list(settings.MIDDLEWARE)
+        api_mode = {**settings.API_MODE, "MIDDLEWARE": [f"{__name__}.SettingsRecordingMiddleware"]}
+        SettingsRecordingMiddleware.seen.clear()
+        with override_settings(API_MODE=api_mode):
+            response = APIWSGIHandler().get_response(self.factory.get(f"/api/markets/{self.market.id}/"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(SettingsRecordingMiddleware.seen, [middleware])
+        self.assertEqual(settings.MIDDLEWARE, middleware)
+
+    def test_api_urlconf_only(self):
+        response = APIWSGIHandler().get_response(self.factory.get("/admin/login/"))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_common_middleware_still_applies(self):
+        response = APIWSGIHandler().get_response(self.factory.get("/api/markets"))
+        self.assertEqual(response.status_code, status.HTTP_301_MOVED_PERMANENTLY)
+        self.assertEqual(response["Location"], "/api/markets/")
+
+    @override_settings(CORS_ALLOWED_ORIGINS=["https://shop.example.com"])
+    def test_cors(self):
+        request = self.factory.get("/api/markets/", HTTP_ORIGIN="https://shop.example.com")
+        response = APIWSGIHandler().get_response(request)
+        self.assertEqual(response["Access-Control-Allow-Origin"], "https://shop.example.com")
+
+    def test_dispatch_by_prefix(self):
+        application = APIModeWSGIApplication()
+        self.assertIsInstance(application.api_handler, APIWSGIHandler)
+        self.assertIs(type(application.handler), WSGIHandler)
+        response = application.handler.get_response(self.factory.get("/admin/login/"))
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+
+    def test_basic_authentication_without_sessions(self):
+        User.objects.create_superuser("admin", "admin@example.com", "secret")
+        handler = APIWSGIHandler()
+        response = handler.get_response(self.factory.get("/api/metrics/"))
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        credentials = base64.b64encode(b"admin:secret").decode()
+        response = handler.get_response(self.factory.get("/api/metrics/", HTTP_AUTHORIZATION=f"Basic {credentials}"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
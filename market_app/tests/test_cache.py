@@ -0,0 +1,101 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.permissions import BasePermission
+from rest_framework.test import APITestCase
+from market_app import cache as cache_module
+from market_app.api.views import ProductDetailView
+from market_app.models import Market, Seller, Product
+
+
+class DenyObjectPermission(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        return False
+
+
+@override_settings(API_CACHE_ENABLED=True)
+class ResponseCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.market = Market.objects.create(
+            name="Downtown Market", location="Munich", description="Test", net_worth="1200000.50"
+        )
+        self.other_market = Market.objects.create(
+            name="Green Valley Market", location="Hamburg", description="Test", net_worth="750000.75"
+        )
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        self.seller.markets.add(self.market)
+        self.product = Product.objects.create(name="Apples", description="Test", price="3.50", seller=self.seller)
+        self.product.markets.add(self.market)
+        self.url = f"/api/products/{self.product.id}/"
+
+    @override_settings(API_CACHE_ENABLED=False)
+    def test_disabled_cache_always_reads_database(self):
+        response = self.client.get(self.url)
+        key = cache_module.response_cache_key(Product, self.product.id, response.wsgi_request)
+        self.assertIsNone(cache.get(key))
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.url).data["name"], "Apples")
+
+    def test_repeated_get_hits_cache(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["name"], "Apples")
+
+    def test_market_detail_is_cached(self):
+        self.client.get(f"/api/markets/{self.market.id}/")
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/markets/{self.market.id}/")
+        self.assertEqual(response.data["name"], "Downtown Market")
+
+    def test_product_update_invalidates(self):
+        self.client.get(self.url)
+        self.client.patch(self.url, {"name": "Pears"}, format="json")
+        self.assertEqual(self.client.get(self.url).data["name"], "Pears")
+
+    def test_market_update_invalidates_embedding_product(self):
+        self.client.get(self.url)
+        self.market.name = "Renamed Market"
+        self.market.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["markets"][0]["name"], "Renamed Market")
+        self.assertEqual(response.data["seller"]["markets"][0]["name"], "Renamed Market")
+
+    def test_seller_update_invalidates_embedding_product(self):
+        self.client.get(self.url)
+        self.seller.name = "Jane Doe"
+        self.seller.save()
+        self.assertEqual(self.client.get(self.url).data["seller"]["name"], "Jane Doe")
+
+    def test_seller_markets_change_invalidates_embedding_product(self):
+        self.client.get(self.url)
+        self.seller.markets.add(self.other_market)
+        self.assertEqual(self.client.get(self.url).data["seller"]["market_count"], 2)
+
+    def test_reverse_markets_change_invalidates(self):
+        self.client.get(self.url)
+        self.other_market.products.add(self.product)
+        self.assertEqual(self.client.get(self.url).data["market_count"], 2)
+
+    def test_market_delete_invalidates(self):
+        self.client.get(self.url)
+        self.market.delete()
+        self.assertEqual(self.client.get(self.url).data["markets"], [])
+
+    def test_query_string_variants_are_cached_separately(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(3):
+            self.client.get(f"{self.url}?format=json")
+
+    def test_cached_response_checks_object_permissions(self):
+        self.client.get(self.url)
+        with mock.patch.object(ProductDetailView, "permission_classes", [DenyObjectPermission]):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cached_response_respects_queryset(self):
+        self.client.get(self.url)
+        with mock.patch.object(ProductDetailView, "get_queryset", lambda view: Product.objects.none()):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
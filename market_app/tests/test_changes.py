@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from market_app import changes
+from market_app.models import Change, Market, Product, Seller
+
+
+class ChangeFeedTestCase(APITestCase):
+    def setUp(self):
+        self.market = Market.objects.create(name="Market", location="Berlin", description="Test", net_worth="10.00")
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        self.seller.markets.add(self.market)
+        self.product = Product.objects.create(name="Apples", description="Test", price="3.50", seller=self.seller)
+        self.product.markets.add(self.market)
+
+    def feed(self, since=0, limit=100):
+        response = self.client.get(f"/api/changes/?since={since}&limit={limit}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def summary(self, data):
+        return [(item["model"], item["id"], item["action"]) for item in data["changes"]]
+
+    def test_initial_sync(self):
+        data = self.feed()
+        self.assertEqual(
+            self.summary(data),
+            [
+                ("market", self.market.id, "upsert"),
+                ("seller", self.seller.id, "upsert"),
+                ("product", self.product.id, "upsert"),
+            ],
+        )
+        product = data["changes"][-1]["data"]
+        self.assertEqual(product["seller"], self.seller.id)
+        self.assertEqual(product["markets"], [self.market.id])
+        self.assertEqual(product["price"], "3.50")
+        self.assertEqual(data["next"], Change.objects.latest("pk").pk)
+        self.assertFalse(data["has_more"])
+
+    def test_incremental_sync(self):
+        since = self.feed()["next"]
+        self.assertEqual(self.feed(since)["changes"], [])
+        self.client.patch(f"/api/products/{self.product.id}/", {"price": "4.00"}, format="json")
+        data = self.feed(since)
+        self.assertEqual(self.summary(data), [("product", self.product.id, "upsert")])
+        self.assertEqual(data["changes"][0]["data"]["price"], "4.00")
+
+    def test_membership_changes(self):
+        since = self.feed()["next"]
+        other = Market.objects.create(name="Other", location="Berlin", description="Test", net_worth="1.00")
+        other.products.add(self.product)
+        self.assertEqual(
+            self.summary(self.feed(since)), [("market", other.id, "upsert"), ("product", self.product.id, "upsert")]
+        )
+
+    def test_tombstones(self):
+        since = self.feed()["next"]
+        seller_id = self.seller.id
+        self.seller.delete()
+        data = self.feed(since)
+        self.assertEqual(self.summary(data), [("product", self.product.id, "upsert"), ("seller", seller_id, "delete")])
+        self.assertIsNone(data["changes"][0]["data"]["seller"])
+        self.assertNotIn("data", data["changes"][1])
+        product_id = self.product.id
+        self.product.delete()
+        self.assertEqual(self.summary(self.feed(since))[-1], ("product", product_id, "delete"))
+
+    def test_paging(self):
+        first = self.feed(limit=2)
+        self.assertTrue(first["has_more"])
+        rest = self.feed(first["next"])
+        self.assertFalse(rest["has_more"])
+        self.assertEqual(
+            {(item["model"], item["id"]) for item in first["changes"] + rest["changes"]},
+            {("market", self.market.id), ("seller", self.seller.id), ("product", self.product.id)},
+        )
+
+    def test_query_count_is_independent_of_catalog_size(self):
+        since = self.feed()["next"]
+        for i in range(20):
+            Product.objects.create(name=f"Product {i}", description="Test", price="1.00", seller=self.seller)
+        self.product.save()
+        latest = Change.objects.latest("pk").pk
+        with self.assertNumQueries(4):
+            data = self.feed(latest - 1)
+        self.assertEqual(self.summary(data), [("product", self.product.id, "upsert")])
+        self.assertEqual(len(self.feed(since)["changes"]), 21)
+
+    def test_compaction_keeps_latest_state(self):
+        for price in ("1.00", "2.00", "3.00"):
+            self.product.price = price
+            self.product.save()
+        before = self.feed()
+        self.assertGreater(changes.compact(), 0)
+        self.assertEqual(Change.objects.filter(model="product", object_id=self.product.id).count(), 1)
+        self.assertEqual(self.feed()["changes"], before["changes"])
+
+    def test_retention(self):
+        since = self.feed()["next"]
+        Change.objects.update(created_at=Change.objects.latest("pk").created_at - timedelta(days=40))
+        expired = Change.objects.filter(pk__lte=since).count()
+        self.product.save()
+        self.assertEqual(changes.prune(), expired)
+        response = self.client.get("/api/changes/?since=0")
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.assertEqual(response.data["horizon"], since)
+        self.assertEqual(self.summary(self.feed(since)), [("product", self.product.id, "upsert")])
+
+    @override_settings(CHANGE_FEED_SETTLE_SECONDS=60)
+    def test_unsettled_changes_are_held_back(self):
+        settled = timezone.now() - timedelta(minutes=2)
+        Change.objects.update(created_at=settled)
+        since = self.feed()["next"]
+        self.assertEqual(since, Change.objects.latest("pk").pk)
+        self.product.save()
+        self.seller.save()
+        Change.objects.filter(model="seller", pk__gt=since).update(created_at=settled)
+        data = self.feed(since)
+        self.assertEqual(data["changes"], [])
+        self.assertEqual(data["next"], since)
+        Change.objects.update(created_at=settled)
+        self.assertEqual(
+            self.summary(self.feed(since)),
+            [("product", self.product.id, "upsert"), ("seller", self.seller.id, "upsert")],
+        )
+
+    def test_invalid_parameters(self):
+        for query in ("since=-1", "limit=0", "limit=5000", "since=abc"):
+            response = self.client.get(f"/api/changes/?{query}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
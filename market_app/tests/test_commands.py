@@ -0,0 +1,358 @@
+import json
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from market_app.api.urls import urlpatterns
+from market_app.bench import UNBENCHMARKED_ROUTES, seed
+from market_app import documents, jobs
+from market_app.models import Change, Job, Market, MarketStats, ProductDocument, Seller, Product
+from market_app.signals import bulk_changed
+
+
+class RepairMarketCountsCommandTestCase(TestCase):
+    def setUp(self):
+        self.market = Market.objects.create(
+            name="Downtown Market", location="Munich", description="Test", net_worth="1200000.50"
+        )
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        self.seller.markets.add(self.market)
+        self.products = [
+            Product.objects.create(name=f"Product {i}", description="Test", price="1.00", seller=self.seller)
+            for i in range(5)
+        ]
+        for product in self.products:
+            product.markets.add(self.market)
+
+    def test_repairs_drift(self):
+        Seller.objects.update(market_count=7)
+        Product.objects.filter(pk__in=[self.products[0].pk, self.products[3].pk]).update(market_count=0)
+        out = StringIO()
+        call_command("repair_market_counts", batch_size=2, stdout=out)
+        self.assertIn("sellers: repaired 1", out.getvalue())
+        self.assertIn("products: repaired 2", out.getvalue())
+        self.assertEqual(Seller.objects.get().market_count, 1)
+        self.assertEqual(set(Product.objects.values_list("market_count", flat=True)), {1})
+
+    def test_nothing_to_repair(self):
+        out = StringIO()
+        call_command("repair_market_counts", stdout=out)
+        self.assertIn("products: repaired 0", out.getvalue())
+
+
+class BenchApiCommandTestCase(TestCase):
+    def test_reports_every_route(self):
+        out = StringIO()
+        call_command(
+            "bench_api", markets=3, sellers=4, products=20, iterations=2, no_isolate=True, stdout=out, stderr=StringIO()
+        )
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["volumes"]["products"], 20)
+        write_only = {"product_bulk", "seller_markets", "product_markets", "market_reprice"}
+        routes = [pattern for pattern in urlpatterns if pattern.name not in UNBENCHMARKED_ROUTES | write_only]
+        for route in [f"GET /api/{pattern.pattern}" for pattern in routes]:
+            self.assertTrue(any(key.startswith(route) for key in report["routes"]), route)
+        for stats in report["routes"].values():
+            self.assertLess(stats["status"], 400)
+            self.assertLessEqual(stats["p50_ms"], stats["p99_ms"])
+            self.assertGreater(stats["peak_kib"], 0)
+        self.assertIn("DELETE /api/products/bulk/", report["routes"])
+        self.assertIn("POST /api/products/<int:pk>/markets/", report["routes"])
+
+    def test_seed_builds_read_models(self):
+        seed(markets=3, sellers=4, products=20)
+        for model in documents.READ_MODELS:
+            self.assertEqual(documents.check(model), {"missing": [], "stale": []}, model)
+        self.assertEqual(MarketStats.objects.count(), 3)
+
+
+class BenchJsonCommandTestCase(TestCase):
+    def test_reports_every_codec(self):
+        out = StringIO()
+        call_command("bench_json", markets=2, sellers=2, products=5, iterations=2, no_isolate=True, stdout=out)
+        report = json.loads(out.getvalue())
+        for codecs in report["payloads"].values():
+            self.assertIn("stdlib", codecs)
+            for stats in codecs.values():
+                self.assertTrue(stats["identical"])
+                self.assertLessEqual(stats["render"]["p50_ms"], stats["render"]["p95_ms"])
+
+
+class BenchConcurrencyCommandTestCase(TransactionTestCase):
+    def test_reports_wsgi_and_asgi_runs(self):
+        out = StringIO()
+        call_command(
+            "bench_concurrency",
+            markets=2,
+            sellers=2,
+            products=10,
+            requests=6,
+            concurrency=3,
+            threads=2,
+            no_isolate=True,
+            stdout=out,
+        )
+        report = json.loads(out.getvalue())
+        self.assertEqual(len(report["runs"]), 3)
+        for name, stats in report["runs"].items():
+            self.assertEqual(stats["requests"], 6, name)
+            self.assertEqual(stats["errors"], 0, name)
+            self.assertGreater(stats["rps"], 0)
+
+
+class BenchMiddlewareCommandTestCase(TestCase):
+    def test_reports_both_stacks(self):
+        out = StringIO()
+        call_command("bench_middleware", markets=2, sellers=2, products=5, requests=3, no_isolate=True, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(len(report["saving_ms"]), 3)
+        for url in report["saving_ms"]:
+            for stack in ("full", "api"):
+                self.assertEqual(report["runs"][f"{stack} {url}"]["errors"], 0)
+
+
+class RebuildMarketStatsCommandTestCase(TestCase):
+    def test_rebuilds_missing_rows(self):
+        market = Market.objects.create(name="Market", location="Munich", description="Test", net_worth="1.00")
+        Product.objects.create(name="Apples", description="Test", price="2.00").markets.add(market)
+        MarketStats.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_market_stats", stdout=out)
+        self.assertIn("Rebuilt stats for 1 markets.", out.getvalue())
+        self.assertEqual(MarketStats.objects.get(market=market).product_count, 1)
+
+
+class ImportCatalogCommandTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.markets = self.write(
+            "markets.csv",
+            "external_id,name,location,description,net_worth\n"
+            "m1,Downtown Market,Munich,Test,1000.00\n"
+            'm2,Harbour Market,Hamburg,"Fish, bread",250.50\n',
+        )
+        self.sellers = self.write(
+            "sellers.ndjson",
+            '{"external_id": "s1", "name": "John Doe", "contact_info": "john@example.com", "markets": ["m1", "m2"]}\n'
+            '{"external_id": "s2", "name": "Jane Roe", "contact_info": "jane@example.com"}\n',
+        )
+        self.products = self.write(
+            "products.csv",
+            "external_id,name,description,price,seller,markets\n"
+            "p1,Apples,Fresh,3.50,s1,m1|m2\n"
+            "p2,Pears,Ripe,2.00,,m2\n"
+            "p3,Plums,Sweet,4.00,s2,\n",
+        )
+
+    def write(self, name, content):
+        path = Path(self.directory.name) / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def run_import(self, **sources):
+        out = StringIO()
+        call_command("import_catalog", chunk_size=2, stdout=out, stderr=StringIO(), **sources)
+        return out.getvalue()
+
+    def test_imports_catalog(self):
+        out = self.run_import(markets=self.markets, sellers=self.sellers, products=self.products)
+        self.assertIn("products: imported 3 rows", out)
+        apples = Product.objects.get(external_id="p1")
+        self.assertEqual(apples.seller.external_id, "s1")
+        self.assertEqual(apples.market_count, 2)
+        self.assertEqual(sorted(apples.markets.values_list("external_id", flat=True)), ["m1", "m2"])
+        self.assertIsNone(Product.objects.get(external_id="p2").seller)
+        self.assertEqual(Market.objects.get(external_id="m2").description, "Fish, bread")
+        self.assertEqual(Seller.objects.get(external_id="s2").market_count, 0)
+        summary = MarketStats.objects.get(market__external_id="m2")
+        self.assertEqual((summary.product_count, summary.seller_count), (2, 1))
+
+    def test_reimport_upserts(self):
+        self.run_import(markets=self.markets, sellers=self.sellers, products=self.products)
+        products = self.write(
+            "update.ndjson",
+            '{"external_id": "p1", "name": "Apples", "description": "Fresh", "price": "5.00", "seller": "s2",'
+            ' "markets": ["m1"]}\n'
+            '{"external_id": "p4", "name": "Figs", "description": "Dried", "price": 7}\n',
+        )
+        self.run_import(products=products)
+        self.assertEqual(Product.objects.count(), 4)
+        apples = Product.objects.get(external_id="p1")
+        self.assertEqual((str(apples.price), apples.seller.external_id, apples.market_count), ("5.00", "s2", 1))
+        self.assertEqual(MarketStats.objects.get(market__external_id="m2").product_count, 1)
+
+    def test_notifies_once_per_model(self):
+        sent = []
+
+        def receiver(sender, pks, **kwargs):
+            sent.append((sender, len(pks)))
+
+        bulk_changed.connect(receiver)
+        self.addCleanup(bulk_changed.disconnect, receiver)
+        self.run_import(markets=self.markets, sellers=self.sellers, products=self.products)
+        self.assertEqual(sent, [(Market, 2), (Seller, 2), (Product, 3)])
+        for model in documents.READ_MODELS:
+            self.assertEqual(documents.check(model), {"missing": [], "stale": []}, model)
+        self.assertEqual(Change.objects.filter(model="product").count(), 3)
+
+    def test_search_index_follows_import(self):
+        self.run_import(markets=self.markets, sellers=self.sellers, products=self.products)
+        response = self.client.get("/api/products/?search=plums")
+        self.assertEqual([item["name"] for item in response.data], ["Plums"])
+
+    def test_errors(self):
+        with self.assertRaisesMessage(CommandError, "unknown seller s1"):
+            self.run_import(markets=self.markets, products=self.products)
+        broken = self.write("broken.csv", "external_id,name,location,description,net_worth\nm9,X,Y,Z,lots\n")
+        with self.assertRaisesMessage(CommandError, "broken.csv:2: net_worth is not a number"):
+            self.run_import(markets=broken)
+        with self.assertRaisesMessage(CommandError, "Provide at least one"):
+            self.run_import()
+
+
+class RunWorkersCommandTestCase(TransactionTestCase):
+    def test_drains_queue(self):
+        market = Market.objects.create(name="Market", location="Berlin", description="Test", net_worth="100.00")
+        for i in range(5):
+            Product.objects.create(name=f"Product {i}", description="Test", price="2.00").markets.add(market)
+        for _ in range(6):
+            jobs.enqueue("reprice_market", market_id=market.pk, percent="50", batch_size=2)
+        out = StringIO()
+        call_command("run_workers", workers=1, burst=True, stdout=out)
+        self.assertIn("Processed 6 jobs.", out.getvalue())
+        self.assertEqual(set(Job.objects.values_list("status", flat=True)), {Job.SUCCEEDED})
+        self.assertEqual(set(Product.objects.values_list("price", flat=True)), {Decimal("22.80")})
+
+    def test_jobs_are_claimed_once(self):
+        first, second = [jobs.enqueue("delete_seller", seller_id=pk) for pk in (1, 2)]
+        self.assertEqual(jobs.claim_next().pk, first.pk)
+        self.assertEqual(jobs.claim_next().pk, second.pk)
+        self.assertIsNone(jobs.claim_next())
+        self.assertEqual(Job.objects.filter(status=Job.RUNNING).count(), 2)
+
+    def expire(self, job):
+        Job.objects.filter(pk=job.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_expired_leases_are_reclaimed(self):
+        seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        job = jobs.enqueue("delete_seller", seller_id=seller.pk)
+        crashed = jobs.claim_next()
+        self.assertIsNone(jobs.claim_next())
+        self.expire(job)
+        reclaimed = jobs.claim_next()
+        self.assertEqual((reclaimed.pk, reclaimed.attempts), (job.pk, 2))
+        jobs.run_job(reclaimed)
+        jobs.run_job(crashed)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result["deleted"]), (Job.SUCCEEDED, True))
+
+    @override_settings(JOB_MAX_ATTEMPTS=2)
+    def test_jobs_fail_after_max_attempts(self):
+        job = jobs.enqueue("delete_seller", seller_id=1)
+        for _ in range(2):
+            jobs.claim_next()
+            self.expire(job)
+        self.assertIsNone(jobs.claim_next())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertIn("Lease expired", job.error)
+
+    def test_heartbeat_renews_and_detects_lost_lease(self):
+        job = jobs.enqueue("delete_seller", seller_id=1)
+        stalled = jobs.claim_next()
+        self.expire(job)
+        token = jobs.current_job.set(stalled)
+        self.addCleanup(jobs.current_job.reset, token)
+        jobs.heartbeat(last_pk=7)
+        self.assertIsNone(jobs.claim_next())
+        self.assertEqual(Job.objects.get(pk=job.pk).progress, {"last_pk": 7})
+        self.expire(job)
+        self.assertEqual(jobs.claim_next().attempts, 2)
+        with self.assertRaises(jobs.LeaseLost):
+            jobs.heartbeat(last_pk=9)
+
+    def test_non_retryable_kinds_are_not_rerun(self):
+        with mock.patch.dict(jobs.handlers, {"send_invoice": lambda: None}):
+            job = jobs.enqueue("send_invoice")
+            jobs.claim_next()
+            self.expire(job)
+            self.assertIsNone(jobs.claim_next())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 1))
+        self.assertIn("not retried", job.error)
+
+    def test_interrupted_reprice_changes_each_price_once(self):
+        market = Market.objects.create(name="Market", location="Berlin", description="Test", net_worth="100.00")
+        for i in range(5):
+            Product.objects.create(name=f"Product {i}", description="Test", price="10.00").markets.add(market)
+        first_batch = list(Product.objects.order_by("pk").values_list("pk", flat=True)[:2])
+        job = jobs.enqueue("reprice_market", market_id=market.pk, percent="10", batch_size=2)
+        crashed = jobs.claim_next()
+        heartbeat = jobs.heartbeat
+
+        def crash_after_first_batch(**progress):
+            if progress["last_pk"] != first_batch[-1]:
+                raise KeyboardInterrupt
+            heartbeat(**progress)
+
+        with mock.patch.object(jobs, "heartbeat", crash_after_first_batch), self.assertRaises(KeyboardInterrupt):
+            jobs.run_job(crashed)
+        self.assertEqual(Product.objects.filter(price=Decimal("11.00")).count(), 2)
+        self.expire(job)
+        resumed = jobs.claim_next()
+        self.assertEqual(resumed.progress, {"last_pk": first_batch[-1], "updated": 2})
+        jobs.run_job(crashed)
+        jobs.run_job(resumed)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result["updated"]), (Job.SUCCEEDED, 5))
+        self.assertEqual(set(Product.objects.values_list("price", flat=True)), {Decimal("11.00")})
+
+
+class ReadModelCommandsTestCase(TestCase):
+    def setUp(self):
+        seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        for i in range(3):
+            Product.objects.create(name=f"Product {i}", description="Test", price="1.00", seller=seller)
+
+    def test_check_and_repair(self):
+        out = StringIO()
+        call_command("check_read_model", stdout=out)
+        self.assertIn("products: 0 missing, 0 stale", out.getvalue())
+        Product.objects.filter(name="Product 0").update(name="Bypassed")
+        ProductDocument.objects.filter(product__name="Product 1").delete()
+        with self.assertRaisesMessage(CommandError, "2 documents are out of date"):
+            call_command("check_read_model", stdout=StringIO())
+        out = StringIO()
+        call_command("check_read_model", repair=True, batch_size=2, stdout=out)
+        self.assertIn("products: repaired 2", out.getvalue())
+        call_command("check_read_model", stdout=StringIO())
+
+    def test_rebuild(self):
+        ProductDocument.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_read_model", stdout=out)
+        self.assertIn("products: rebuilt 3", out.getvalue())
+        self.assertEqual(ProductDocument.objects.count(), 3)
+
+
+class CompactChangesCommandTestCase(TestCase):
+    def test_compacts_and_prunes(self):
+        market = Market.objects.create(name="Market", location="Berlin", description="Test", net_worth="1.00")
+        for name in ("Renamed", "Renamed again"):
+            market.name = name
+            market.save()
+        out = StringIO()
+        call_command("compact_changes", stdout=out)
+        self.assertIn("Compacted 2 and pruned 0 changes; horizon is 0.", out.getvalue())
+        latest = Change.objects.get().pk
+        out = StringIO()
+        call_command("compact_changes", retention_days=-1, stdout=out)
+        self.assertIn(f"pruned 1 changes; horizon is {latest}.", out.getvalue())
+        self.assertFalse(Change.objects.exists())
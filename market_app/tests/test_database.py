@@ -0,0 +1,88 @@
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import TestCase
+
+from django.conf import settings
+from django.db import connections, transaction
+from market_app.models import Product
+
+ALIAS = "concurrency"
+
+
+class SQLiteConcurrencyTestCase(TestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        if connections["default"].vendor != "sqlite":
+            self.skipTest("SQLite only")
+        self.directory = tempfile.mkdtemp()
+        path = Path(self.directory) / "db.sqlite3"
+        connections["default"].ensure_connection()
+        target = sqlite3.connect(path)
+        connections["default"].connection.backup(target)
+        target.close()
+        connections.settings[ALIAS] = connections.configure_settings(
+            {"default": {}, ALIAS: {**settings.DATABASES["default"], "NAME": str(path), "TEST": {}}}
+        )[ALIAS]
+        self.addCleanup(self.remove_alias)
+        Product.objects.using(ALIAS).bulk_create(
+            Product(name=f"Existing {i}", description="Test", price="1.00") for i in range(10)
+        )
+
+    def remove_alias(self):
+        connections[ALIAS].close()
+        del connections[ALIAS]
+        del connections.settings[ALIAS]
+        shutil.rmtree(self.directory)
+
+    def test_connection_pragmas(self):
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "wal")
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_readers_progress_during_bulk_import(self):
+        started, finished = threading.Event(), threading.Event()
+        errors, reads = [], []
+
+        def bulk_import():
+            try:
+                with transaction.atomic(using=ALIAS):
+                    for batch in range(20):
+                        Product.objects.using(ALIAS).bulk_create(
+                            Product(name=f"Imported {batch}-{i}", description="Test", price="2.00") for i in range(500)
+                        )
+                        started.set()
+                        time.sleep(0.01)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                started.set()
+                finished.set()
+                connections.close_all()
+
+        def read():
+            started.wait()
+            try:
+                while not finished.is_set():
+                    reads.append(Product.objects.using(ALIAS).count())
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=bulk_import)] + [threading.Thread(target=read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertGreater(reads.count(10), 10)
+        self.assertLessEqual(set(reads), {10, 10010})
+        self.assertEqual(Product.objects.using(ALIAS).count(), 10010)
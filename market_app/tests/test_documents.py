@@ -0,0 +1,97 @@
+from django.db import transaction
+from rest_framework import status
+from rest_framework.test import APITestCase
+from market_app import documents
+from market_app.models import Market, Product, ProductDocument, Seller, SellerDocument
+
+
+class ReadModelTestCase(APITestCase):
+    def setUp(self):
+        self.markets = [
+            Market.objects.create(name=f"Market {i}", location="Berlin", description="Test", net_worth="1000.00")
+            for i in range(3)
+        ]
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        self.seller.markets.set(self.markets[:2])
+        self.product = Product.objects.create(name="Apples", description="Test", price="3.50", seller=self.seller)
+        self.product.markets.set(self.markets[1:])
+        self.other = Product.objects.create(name="Pears", description="Test", price="1.00")
+
+    def assertFresh(self):
+        for model in documents.READ_MODELS:
+            self.assertEqual(documents.check(model), {"missing": [], "stale": []}, model)
+
+    def document(self, product):
+        return documents.loads(ProductDocument.objects.get(product=product).body)
+
+    def test_documents_match_live_responses(self):
+        self.assertFresh()
+        for url in ("/api/products/", f"/api/products/{self.product.id}/", "/api/sellers/"):
+            with self.subTest(url=url):
+                served = self.client.get(url).data
+                with self.settings(READ_MODEL_ENABLED=False):
+                    self.assertEqual(served, self.client.get(url).data)
+
+    def test_writes_keep_documents_fresh(self):
+        self.markets[1].name = "Renamed"
+        self.markets[1].save()
+        self.assertEqual(self.document(self.product)["seller"]["markets"][1]["name"], "Renamed")
+        self.seller.name = "Jane Doe"
+        self.seller.save()
+        self.markets[2].products.add(self.other)
+        self.seller.markets.add(self.markets[2])
+        self.product.markets.remove(self.markets[1])
+        self.assertFresh()
+        self.client.patch(f"/api/products/{self.product.id}/", {"price": "4.00"}, format="json")
+        self.client.post(f"/api/products/{self.other.id}/markets/", {"add": [self.markets[0].id]}, format="json")
+        self.client.patch("/api/products/bulk/", [{"id": self.other.id, "name": "Plums"}], format="json")
+        self.assertFresh()
+        self.assertEqual(self.document(self.other)["name"], "Plums")
+
+    def test_deletes_keep_documents_fresh(self):
+        self.markets[1].delete()
+        self.assertFresh()
+        self.seller.delete()
+        self.assertIsNone(self.document(self.product)["seller"])
+        self.product.delete()
+        self.assertEqual(list(ProductDocument.objects.values_list("product_id", flat=True)), [self.other.id])
+        self.assertFalse(SellerDocument.objects.exists())
+
+    def test_market_save_renders_documents_in_writing_transaction(self):
+        self.markets[1].name = "Renamed"
+        with self.captureOnCommitCallbacks() as callbacks, transaction.atomic():
+            self.markets[1].save()
+            self.assertEqual(self.document(self.product)["seller"]["markets"][1]["name"], "Renamed")
+        self.assertFalse(any(callback.__module__ == documents.__name__ for callback in callbacks))
+
+    def test_market_save_renders_each_document_once(self):
+        for i in range(20):
+            product = Product.objects.create(name=f"Product {i}", description="Test", price="1.00", seller=self.seller)
+            product.markets.set(self.markets)
+        self.markets[0].name = "Renamed"
+        with self.assertNumQueries(14):
+            self.markets[0].save()
+        self.assertEqual(self.document(self.product)["seller"]["markets"][0]["name"], "Renamed")
+        self.assertFresh()
+
+    def test_missing_documents_fall_back_to_live_rendering(self):
+        ProductDocument.objects.filter(product=self.product).delete()
+        response = self.client.get("/api/products/?page_size=1")
+        self.assertEqual(response.data["results"][0]["name"], "Apples")
+        response = self.client.get(f"/api/products/{self.product.id}/")
+        self.assertEqual(response.data["seller"]["name"], "John Doe")
+        self.assertEqual(self.client.get("/api/products/999999/").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_check_detects_bypassed_writes(self):
+        Product.objects.filter(pk=self.product.pk).update(name="Bypassed")
+        ProductDocument.objects.filter(product=self.other).delete()
+        self.assertEqual(documents.check(Product), {"missing": [self.other.id], "stale": [self.product.id]})
+        documents.rebuild(Product)
+        self.assertFresh()
+
+    def test_list_reads_are_a_single_scan(self):
+        for i in range(20):
+            Product.objects.create(name=f"Product {i}", description="Test", price="1.00", seller=self.seller)
+        with self.assertNumQueries(4):
+            response = self.client.get("/api/products/?page_size=10&ordering=price")
+        self.assertEqual(len(response.data["results"]), 10)
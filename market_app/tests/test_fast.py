@@ -0,0 +1,54 @@
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from market_app.models import Market, Product, Seller
+from market_app.api.fast import FastMarketSerializer, FastProductSerializer, FastSellerSerializer
+from market_app.api.serializers import MarketSerializer, ProductSerializer, SellerSerializer
+
+
+class FastSerializerParityTestCase(TestCase):
+    def setUp(self):
+        self.markets = [
+            Market.objects.create(name=f"Märkt {i}", location="Berlin", description="Test", net_worth=f"{i}000.5")
+            for i in range(3)
+        ]
+        seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        seller.markets.set(self.markets[1:])
+        Seller.objects.create(name="Jane Doe", contact_info="jane.doe@example.com")
+        product = Product.objects.create(name="Apples", description="Test", price="3.5", seller=seller)
+        product.markets.set(self.markets[::-1])
+        Product.objects.create(name="Pears", description="Test", price="1.00")
+
+    def assertParity(self, model, serializer_class, fast_serializer_class, fields=None, expand=None):
+        queryset = model.objects.order_by("pk")
+        if hasattr(serializer_class, "setup_eager_loading"):
+            queryset = serializer_class.setup_eager_loading(queryset, fields=fields, expand=expand)
+        expected = serializer_class(queryset, many=True, fields=fields, expand=expand).data
+        fast = fast_serializer_class(fields=fields, expand=expand)
+        actual = fast.render(list(fast.values(model.objects.order_by("pk"))))
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_markets(self):
+        self.assertParity(Market, MarketSerializer, FastMarketSerializer)
+        self.assertParity(Market, MarketSerializer, FastMarketSerializer, fields=["id", "net_worth"])
+
+    def test_sellers(self):
+        for expand in (None, [], ["markets"]):
+            with self.subTest(expand=expand):
+                self.assertParity(Seller, SellerSerializer, FastSellerSerializer, expand=expand)
+        self.assertParity(Seller, SellerSerializer, FastSellerSerializer, fields=["markets"], expand=[])
+
+    def test_products(self):
+        for expand in (None, [], ["seller"], ["seller", "seller.markets", "markets"]):
+            with self.subTest(expand=expand):
+                self.assertParity(Product, ProductSerializer, FastProductSerializer, expand=expand)
+        self.assertParity(Product, ProductSerializer, FastProductSerializer, fields=["id", "price"])
+        self.assertParity(Product, ProductSerializer, FastProductSerializer, fields=["seller"], expand=["seller"])
+
+    def test_market_pool_fetches_each_market_once(self):
+        fast = FastProductSerializer()
+        rows = list(fast.values(Product.objects.order_by("pk")))
+        with self.assertNumQueries(3):
+            data = fast.render(rows)
+        self.assertEqual(data[0]["markets"][1], data[0]["seller"]["markets"][0])
+        self.assertIsNone(data[1]["seller"])
+        self.assertEqual(data[1]["markets"], [])
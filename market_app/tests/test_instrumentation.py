@@ -0,0 +1,73 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, modify_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from market_app.instrumentation import RequestMetrics, store
+from market_app.models import Market, Seller
+
+
+@modify_settings(MIDDLEWARE={"prepend": "market_app.instrumentation.QueryInstrumentationMiddleware"})
+class InstrumentationMiddlewareTestCase(APITestCase):
+    def setUp(self):
+        store.clear()
+        self.market = Market.objects.create(
+            name="Downtown Market", location="Munich", description="Test", net_worth="1200000.50"
+        )
+
+    def test_server_timing_header(self):
+        response = self.client.get("/api/markets/")
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+, total')
+
+    def test_non_api_routes_are_ignored(self):
+        response = self.client.get("/admin/login/")
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(store.report(), [])
+
+    def test_route_aggregates(self):
+        for _ in range(3):
+            self.client.get(f"/api/markets/{self.market.id}/")
+        self.client.get("/api/markets/")
+        report = {row["route"]: row for row in store.report()}
+        detail = report["GET /api/markets/<int:pk>/"]
+        self.assertEqual(detail["requests"], 3)
+        self.assertLessEqual(detail["p50_ms"], detail["p99_ms"])
+        self.assertGreater(detail["avg_size_bytes"], 0)
+        self.assertIn("GET /api/markets/", report)
+
+    def test_metrics_endpoint_requires_admin(self):
+        self.client.get("/api/markets/")
+        response = self.client.get("/api/metrics/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "secret"))
+        response = self.client.get("/api/metrics/?sort=avg_queries&top=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    async def test_async_views_are_instrumented(self):
+        response = await self.async_client.get("/api/async/markets/")
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="1 queries", serialize;dur=[\d.]+, total')
+        report = {row["route"]: row for row in store.report()}
+        self.assertEqual(report["GET /api/async/markets/"]["max_queries"], 1)
+
+    def test_store_is_bounded(self):
+        store.max_routes = 1
+        try:
+            self.client.get("/api/markets/")
+            self.client.get("/api/sellers/")
+            self.assertEqual([row["route"] for row in store.report()], ["GET /api/markets/"])
+        finally:
+            store.max_routes = 200
+
+
+class DuplicateQueryDetectionTestCase(TestCase):
+    def test_flags_repeated_statements(self):
+        sellers = [Seller.objects.create(name=f"Seller {i}", contact_info="-") for i in range(6)]
+        metrics = RequestMetrics()
+        with connection.execute_wrapper(metrics):
+            for seller in Seller.objects.all():
+                seller.markets.count()
+        self.assertEqual(metrics.queries, len(sellers) + 1)
+        duplicates = metrics.duplicates(threshold=5)
+        self.assertEqual(len(duplicates), 1)
+        self.assertEqual(list(duplicates.values()), [6])
@@ -1,5 +1,10 @@
-from django.test import TestCase
-from market_app.models import Market, Seller, Product
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from market_app.models import Market, MarketStats, Seller, Product
+from market_app import stats
+from market_app.stats import STAT_FIELDS, aggregate_market_stats, rebuild_market_stats
 
 
 class MarketModelTestCase(TestCase):
@@ -83,3 +88,129 @@ class ProductModelTestCase(TestCase):
             seller=self.seller,
         )
         self.assertEqual(product.markets.count(), 0)
+
+
+class MarketCountTestCase(TestCase):
+    def setUp(self):
+        self.markets = [
+            Market.objects.create(name=f"Market {i}", location="Berlin", description="Test", net_worth="1000.00")
+            for i in range(3)
+        ]
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        self.product = Product.objects.create(name="Apples", description="Test", price=3.50, seller=self.seller)
+
+    def assertCounts(self, seller, product):
+        self.assertEqual(Seller.objects.get(pk=self.seller.pk).market_count, seller)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).market_count, product)
+
+    def test_forward_changes(self):
+        self.seller.markets.add(*self.markets)
+        self.product.markets.set(self.markets[:2])
+        self.assertEqual(self.seller.market_count, 3)
+        self.assertEqual(self.product.market_count, 2)
+        self.assertCounts(3, 2)
+        self.seller.markets.remove(self.markets[0])
+        self.product.markets.clear()
+        self.assertCounts(2, 0)
+
+    def test_reverse_changes(self):
+        self.markets[0].sellers.add(self.seller)
+        self.markets[1].products.add(self.product)
+        self.markets[2].products.add(self.product)
+        self.assertCounts(1, 2)
+        self.markets[1].products.clear()
+        self.markets[0].sellers.remove(self.seller)
+        self.assertCounts(0, 1)
+
+    def test_stale_instance_save_keeps_count(self):
+        seller = Seller.objects.get(pk=self.seller.pk)
+        product = Product.objects.get(pk=self.product.pk)
+        self.markets[0].sellers.add(self.seller)
+        self.markets[0].products.add(self.product)
+        seller.name = "Jane Doe"
+        seller.save()
+        product.save()
+        self.assertCounts(1, 1)
+        self.assertEqual(Seller.objects.get(pk=self.seller.pk).name, "Jane Doe")
+
+    def test_market_delete(self):
+        self.seller.markets.add(*self.markets)
+        self.product.markets.add(*self.markets)
+        self.markets[0].delete()
+        self.assertCounts(2, 2)
+
+
+class MarketStatsTestCase(TestCase):
+    def setUp(self):
+        self.markets = [
+            Market.objects.create(name=f"Market {i}", location="Berlin", description="Test", net_worth="1000.00")
+            for i in range(2)
+        ]
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        self.products = [
+            Product.objects.create(name=f"Product {i}", description="Test", price=price, seller=self.seller)
+            for i, price in enumerate(["1.00", "2.00", "6.00"])
+        ]
+
+    def summary(self, market):
+        return MarketStats.objects.get(market=market)
+
+    def assertMatchesLive(self):
+        live = {row["id"]: row for row in aggregate_market_stats(Market.objects.all())}
+        for summary in MarketStats.objects.all():
+            for field in STAT_FIELDS:
+                expected = live[summary.market_id][field]
+                if isinstance(expected, Decimal):
+                    expected = expected.quantize(Decimal("0.01"))
+                self.assertEqual(getattr(summary, field), expected, field)
+
+    def test_created_with_market(self):
+        summary = self.summary(self.markets[0])
+        self.assertEqual((summary.product_count, summary.seller_count, summary.total_value), (0, 0, 0))
+        self.assertIsNone(summary.min_price)
+
+    def test_membership_changes(self):
+        self.markets[0].products.add(*self.products)
+        self.products[2].markets.add(self.markets[1])
+        self.seller.markets.set(self.markets)
+        summary = self.summary(self.markets[0])
+        self.assertEqual((summary.product_count, summary.seller_count), (3, 1))
+        self.assertEqual(
+            (summary.min_price, summary.avg_price, summary.max_price), (Decimal("1"), Decimal("3"), Decimal("6"))
+        )
+        self.assertEqual(summary.total_value, Decimal("9"))
+        self.assertEqual(self.summary(self.markets[1]).total_value, Decimal("6"))
+
+        self.products[2].markets.clear()
+        self.markets[0].sellers.clear()
+        self.assertEqual(self.summary(self.markets[0]).total_value, Decimal("3"))
+        self.assertEqual(self.summary(self.markets[0]).seller_count, 0)
+        self.assertEqual(self.summary(self.markets[1]).product_count, 0)
+        self.assertMatchesLive()
+
+    def test_price_changes_and_deletes(self):
+        self.markets[0].products.add(*self.products)
+        self.seller.markets.add(self.markets[0])
+        self.products[0].price = Decimal("10.00")
+        self.products[0].save()
+        self.assertEqual(self.summary(self.markets[0]).max_price, Decimal("10"))
+        self.products[1].delete()
+        Product.objects.filter(pk=self.products[2].pk).delete()
+        self.seller.delete()
+        summary = self.summary(self.markets[0])
+        self.assertEqual((summary.product_count, summary.seller_count, summary.total_value), (1, 0, Decimal("10")))
+        self.assertMatchesLive()
+
+    def test_queryset_delete_refreshes_once(self):
+        self.markets[0].products.add(*self.products)
+        with mock.patch.object(stats, "refresh_market_stats", wraps=stats.refresh_market_stats) as refresh:
+            Product.objects.filter(pk__in=[product.pk for product in self.products]).delete()
+        refresh.assert_called_once_with({self.markets[0].pk})
+        self.assertEqual(self.summary(self.markets[0]).product_count, 0)
+
+    @override_settings(MARKET_STATS_MATERIALIZED=False)
+    def test_disabled(self):
+        self.markets[0].products.add(*self.products)
+        self.assertEqual(self.summary(self.markets[0]).product_count, 0)
+        self.assertEqual(rebuild_market_stats(batch_size=1), 2)
+        self.assertEqual(self.summary(self.markets[0]).product_count, 3)
@@ -0,0 +1,74 @@
+import datetime
+import json
+import uuid
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock, skipIf
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from market_app.api import renderers
+from market_app.api.renderers import ORJSONParser, ORJSONRenderer
+from market_app.api.serializers import MarketSerializer
+from market_app.models import Market
+
+
+@skipIf(renderers.orjson is None, "orjson is not installed")
+class ORJSONRendererTestCase(SimpleTestCase):
+    def assertSameAsDefault(self, data, accepted_media_type="application/json"):
+        expected = JSONRenderer().render(data, accepted_media_type)
+        self.assertEqual(ORJSONRenderer().render(data, accepted_media_type), expected)
+
+    def test_decimal_formatting(self):
+        market = Market(id=1, name="Märkt", location="Berlin", description="Test", net_worth=Decimal("1200000.5"))
+        data = MarketSerializer(market).data
+        self.assertEqual(data["net_worth"], "1200000.50")
+        self.assertSameAsDefault(data)
+        self.assertSameAsDefault({"price": Decimal("3.50")})
+
+    def test_matches_default_encoding(self):
+        self.assertSameAsDefault(
+            {
+                "text": "Grüße \u2028\u2029 \"quoted\"",
+                "created": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+                "day": datetime.date(2024, 5, 1),
+                "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+                "lazy": gettext_lazy("This field is required."),
+                "nested": [{1: None, "ok": True}],
+            }
+        )
+
+    def test_large_integers_fall_back_to_default(self):
+        self.assertSameAsDefault({"big": 2**64, "small": -(2**63) - 1, "ok": [2**63 - 1]})
+
+    def test_floats_decode_to_same_values(self):
+        data = {"values": [0.1, 1.5, 1e-05, 1.5e20, -2.5e-7, 123456789.125]}
+        rendered = ORJSONRenderer().render(data)
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(data)))
+        self.assertEqual(json.loads(rendered), data)
+
+    def test_indent_falls_back_to_default(self):
+        self.assertSameAsDefault({"a": [1, 2]}, "application/json; indent=4")
+
+    def test_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_without_orjson(self):
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(ORJSONRenderer().render({"a": "ü"}), b'{"a":"\xc3\xbc"}')
+            self.assertEqual(ORJSONParser().parse(BytesIO(b'{"a": 1}')), {"a": 1})
+
+
+@skipIf(renderers.orjson is None, "orjson is not installed")
+class ORJSONParserTestCase(SimpleTestCase):
+    def test_parse(self):
+        body = '{"name": "Märkt", "price": "3.50", "ids": [1, 2]}'.encode()
+        self.assertEqual(ORJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+
+    def test_invalid(self):
+        for body in (b"{", b'{"a": NaN}'):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                ORJSONParser().parse(BytesIO(body))
@@ -0,0 +1,85 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache as django_cache
+from django.test import SimpleTestCase, modify_settings, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from market_app import cache
+from market_app.models import Market, Product
+from market_app.routers import ReplicaRouter, use_database
+
+REPLICAS = {"ALIASES": ["default"], "STICKY_SECONDS": 30, "COOKIE_NAME": "primary_until", "APP_LABELS": ["market_app"]}
+
+
+@override_settings(DATABASE_ROUTERS=["market_app.routers.ReplicaRouter"], API_REPLICAS=REPLICAS)
+class ReplicaRouterTestCase(SimpleTestCase):
+    def test_reads_follow_selected_replica(self):
+        self.assertEqual(Product.objects.all().db, "default")
+        with use_database("replica1"):
+            self.assertEqual(Product.objects.all().db, "replica1")
+            self.assertEqual(Market.objects.all().db, "replica1")
+            self.assertEqual(User.objects.all().db, "default")
+
+    def test_writes_go_to_primary(self):
+        with use_database("replica1"):
+            self.assertEqual(ReplicaRouter().db_for_write(Product), "default")
+
+    def test_replicas_are_not_migrated(self):
+        with self.settings(API_REPLICAS={**REPLICAS, "ALIASES": ["replica1"]}):
+            self.assertFalse(ReplicaRouter().allow_migrate("replica1", "market_app"))
+            self.assertIsNone(ReplicaRouter().allow_migrate("default", "market_app"))
+
+
+@override_settings(DATABASE_ROUTERS=["market_app.routers.ReplicaRouter"], API_REPLICAS=REPLICAS, API_CACHE_ENABLED=True)
+@modify_settings(MIDDLEWARE={"append": "market_app.routers.ReplicaRoutingMiddleware"})
+class ReplicaRoutingMiddlewareTestCase(APITestCase):
+    def setUp(self):
+        self.market = Market.objects.create(name="Market", location="Berlin", description="Test", net_worth="1.00")
+
+    def test_reads_use_replica(self):
+        for url in ("/api/markets/", f"/api/markets/{self.market.id}/", "/api/async/products/"):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.wsgi_request.read_database, "default")
+
+    def test_other_views_use_primary(self):
+        response = self.client.get("/api/products/export/")
+        self.assertIsNone(response.wsgi_request.read_database)
+
+    def test_writes_make_client_sticky(self):
+        response = self.client.post(
+            "/api/markets/", {"name": "New", "location": "Berlin", "description": "Test", "net_worth": "1.00"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(response.wsgi_request.read_database)
+        cookie = response.cookies["primary_until"]
+        self.assertEqual(cookie["max-age"], 30)
+        self.assertGreater(float(cookie.value), time.time())
+
+        response = self.client.get(f"/api/markets/{response.data['id']}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.wsgi_request.read_database)
+
+    def test_expired_stickiness(self):
+        self.client.cookies["primary_until"] = str(time.time() - 1)
+        response = self.client.get("/api/markets/")
+        self.assertEqual(response.wsgi_request.read_database, "default")
+
+    def test_replica_reads_do_not_fill_response_cache(self):
+        django_cache.clear()
+        url = f"/api/markets/{self.market.id}/"
+        response = self.client.get(url)
+        self.assertEqual(response.wsgi_request.read_database, "default")
+        key = cache.response_cache_key(Market, self.market.id, response.wsgi_request)
+        self.assertIsNone(django_cache.get(key))
+        self.client.cookies["primary_until"] = str(time.time() + 30)
+        response = self.client.get(url)
+        self.assertIsNone(response.wsgi_request.read_database)
+        self.assertEqual(django_cache.get(key)["name"], "Market")
+
+    def test_failed_writes_are_not_sticky(self):
+        response = self.client.post("/api/markets/", {"name": ""})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn("primary_until", response.cookies)
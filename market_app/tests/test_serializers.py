@@ -1,4 +1,6 @@
 from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 from market_app.models import Market, Seller
 from market_app.api.serializers import MarketSerializer, SellerSerializer, ProductSerializer
 
@@ -157,3 +159,48 @@ class ProductSerializerTestCase(TestCase):
         serializer = ProductSerializer(data=data)
         self.assertFalse(serializer.is_valid())
         self.assertIn("price", serializer.errors)
+
+
+class BatchedPrimaryKeyRelatedFieldTestCase(TestCase):
+    def setUp(self):
+        self.markets = [
+            Market.objects.create(name=f"Market {i}", location="Berlin", description="Test", net_worth="1000.00")
+            for i in range(20)
+        ]
+        self.seller = Seller.objects.create(name="John Doe", contact_info="john.doe@example.com")
+        self.data = {
+            "name": "Organic Apples",
+            "description": "Fresh organic apples from local farms.",
+            "price": "3.50",
+            "markets_ids": [market.id for market in self.markets],
+            "seller_id": self.seller.id,
+        }
+
+    def test_markets_resolved_with_one_query(self):
+        serializer = ProductSerializer(data=self.data)
+        with self.assertNumQueries(2):
+            self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data["markets"], self.markets)
+        self.assertEqual(serializer.validated_data["seller"], self.seller)
+
+    def test_missing_ids_are_reported(self):
+        self.data["markets_ids"] = [self.markets[0].id, 998, self.markets[1].id, 999]
+        serializer = ProductSerializer(data=self.data)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(
+            serializer.errors["markets_ids"],
+            ['Invalid pk "998" - object does not exist.', 'Invalid pk "999" - object does not exist.'],
+        )
+
+    def test_incorrect_type(self):
+        self.data["seller_id"] = "abc"
+        serializer = ProductSerializer(data=self.data)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors["seller_id"][0].code, "incorrect_type")
+
+    def test_request_scoped_cache_is_shared(self):
+        request = Request(APIRequestFactory().post("/"))
+        ProductSerializer(data=self.data, context={"request": request}).is_valid()
+        seller_data = {"name": "Jane Doe", "contact_info": "jane@example.com", "markets_ids": self.data["markets_ids"]}
+        with self.assertNumQueries(0):
+            self.assertTrue(SellerSerializer(data=seller_data, context={"request": request}).is_valid())
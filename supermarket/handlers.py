@@ -0,0 +1,107 @@
+import django
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler, get_path_info
+from django.utils.module_loading import import_string
+
+
+def get_api_mode():
+    return settings.API_MODE
+
+
+class APIHandlerMixin:
+    def load_middleware(self, is_async=False):
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+        handler = convert_exception_to_response(self._get_response_async if is_async else self._get_response)
+        handler_is_async = is_async
+        for middleware_path in reversed(get_api_mode()["MIDDLEWARE"]):
+            middleware = import_string(middleware_path)
+            can_sync = getattr(middleware, "sync_capable", True)
+            can_async = getattr(middleware, "async_capable", False)
+            if not can_sync and not can_async:
+                raise RuntimeError(
+                    f"Middleware {middleware_path} must have at least one of sync_capable/async_capable set to True."
+                )
+            middleware_is_async = can_async if handler_is_async or not can_sync else False
+            adapted_handler = self.adapt_method_mode(
+                middleware_is_async,
+                handler,
+                handler_is_async,
+                debug=settings.DEBUG,
+                name=f"middleware {middleware_path}",
+            )
+            try:
+                instance = middleware(adapted_handler)
+            except MiddlewareNotUsed:
+                continue
+            if instance is None:
+                raise ImproperlyConfigured(f"Middleware factory {middleware_path} returned None.")
+            handler = adapted_handler
+            if hasattr(instance, "process_view"):
+                self._view_middleware.insert(0, self.adapt_method_mode(is_async, instance.process_view))
+            if hasattr(instance, "process_template_response"):
+                self._template_response_middleware.append(
+                    self.adapt_method_mode(is_async, instance.process_template_response)
+                )
+            if hasattr(instance, "process_exception"):
+                self._exception_middleware.append(self.adapt_method_mode(False, instance.process_exception))
+            handler = convert_exception_to_response(instance)
+            handler_is_async = middleware_is_async
+        self._middleware_chain = self.adapt_method_mode(is_async, handler, handler_is_async)
+
+    def get_response(self, request):
+        request.urlconf = get_api_mode()["URLCONF"]
+        return super().get_response(request)
+
+    async def get_response_async(self, request):
+        request.urlconf = get_api_mode()["URLCONF"]
+        return await super().get_response_async(request)
+
+
+class APIWSGIHandler(APIHandlerMixin, WSGIHandler):
+    pass
+
+
+class APIASGIHandler(APIHandlerMixin, ASGIHandler):
+    pass
+
+
+class APIModeWSGIApplication:
+    def __init__(self):
+        self.prefix = get_api_mode()["PATH_PREFIX"]
+        self.handler = WSGIHandler()
+        self.api_handler = APIWSGIHandler()
+
+    def __call__(self, environ, start_response):
+        handler = self.api_handler if get_path_info(environ).startswith(self.prefix) else self.handler
+        return handler(environ, start_response)
+
+
+class APIModeASGIApplication:
+    def __init__(self):
+        self.prefix = get_api_mode()["PATH_PREFIX"]
+        self.handler = ASGIHandler()
+        self.api_handler = APIASGIHandler()
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "").removeprefix(scope.get("root_path", ""))
+        handler = self.api_handler if scope["type"] == "http" and path.startswith(self.prefix) else self.handler
+        await handler(scope, receive, send)
+
+
+def get_wsgi_application():
+    django.setup(set_prefix=False)
+    if get_api_mode()["ENABLED"]:
+        return APIModeWSGIApplication()
+    return WSGIHandler()
+
+
+def get_asgi_application():
+    django.setup(set_prefix=False)
+    if get_api_mode()["ENABLED"]:
+        return APIModeASGIApplication()
+    return ASGIHandler()
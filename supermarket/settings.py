@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -52,6 +54,37 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request query/timing instrumentation for the api/ routes (Server-Timing headers and /api/metrics/)
+
+API_INSTRUMENTATION = {
+    "ENABLED": DEBUG,
+    "PATH_PREFIX": "/api/",
+    "MAX_ROUTES": 200,
+    "MAX_SAMPLES": 1000,
+    "DUPLICATE_THRESHOLD": 5,
+}
+
+# API mode: supermarket.wsgi/asgi serve PATH_PREFIX with URLCONF and this stateless middleware chain,
+# everything else (admin) keeps MIDDLEWARE
+
+API_MODE = {
+    "ENABLED": os.environ.get("API_MODE", "false").lower() in ("1", "true", "yes"),
+    "PATH_PREFIX": "/api/",
+    "URLCONF": "supermarket.api_urls",
+    "MIDDLEWARE": [
+        "django.middleware.security.SecurityMiddleware",
+        "corsheaders.middleware.CorsMiddleware",
+        "django.middleware.common.CommonMiddleware",
+    ],
+}
+
+if API_INSTRUMENTATION["ENABLED"]:
+    MIDDLEWARE.insert(0, "market_app.instrumentation.QueryInstrumentationMiddleware")
+    API_MODE["MIDDLEWARE"].insert(0, "market_app.instrumentation.QueryInstrumentationMiddleware")
+
+CORS_ALLOWED_ORIGINS = list(filter(None, os.environ.get("CORS_ALLOWED_ORIGINS", "").split(",")))
+CORS_URLS_REGEX = r"^/api/.*$"
+
 ROOT_URLCONF = "supermarket.urls"
 
 TEMPLATES = [
@@ -76,13 +109,168 @@ WSGI_APPLICATION = "supermarket.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# DATABASE_ENGINE selects "sqlite" (default) or "postgresql"; the remaining DATABASE_* variables tune it.
+# Persistent connections (DATABASE_CONN_MAX_AGE) only pay off under WSGI; use 0 when serving through ASGI.
+
+DATABASE_ENGINE = os.environ.get("DATABASE_ENGINE", "sqlite")
+
+if DATABASE_ENGINE == "postgresql":
+    DATABASE_POOL = os.environ.get("DATABASE_POOL", "false").lower() in ("1", "true", "yes")
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("DATABASE_NAME", "supermarket"),
+            "USER": os.environ.get("DATABASE_USER", ""),
+            "PASSWORD": os.environ.get("DATABASE_PASSWORD", ""),
+            "HOST": os.environ.get("DATABASE_HOST", ""),
+            "PORT": os.environ.get("DATABASE_PORT", ""),
+            "CONN_MAX_AGE": 0 if DATABASE_POOL else int(os.environ.get("DATABASE_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "pool": {
+                    "min_size": int(os.environ.get("DATABASE_POOL_MIN_SIZE", "2")),
+                    "max_size": int(os.environ.get("DATABASE_POOL_MAX_SIZE", "10")),
+                    "timeout": float(os.environ.get("DATABASE_POOL_TIMEOUT", "10")),
+                }
+            }
+            if DATABASE_POOL
+            else {},
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("DATABASE_NAME", BASE_DIR / "db.sqlite3"),
+            "CONN_MAX_AGE": int(os.environ.get("DATABASE_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "transaction_mode": "IMMEDIATE",
+                "init_command": "; ".join(
+                    [
+                        "PRAGMA journal_mode = WAL",
+                        "PRAGMA synchronous = NORMAL",
+                        f"PRAGMA busy_timeout = {int(os.environ.get('SQLITE_BUSY_TIMEOUT', '5000'))}",
+                        f"PRAGMA mmap_size = {int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))}",
+                        f"PRAGMA cache_size = {int(os.environ.get('SQLITE_CACHE_SIZE', '-65536'))}",
+                        "PRAGMA temp_store = MEMORY",
+                    ]
+                ),
+            },
+        }
+    }
+
+# Read replicas: DATABASE_REPLICAS is a comma-separated list of SQLite files (or PostgreSQL hosts), one per replica.
+# Safe requests to the market, seller and product views read from a random replica unless the client wrote within
+# the last STICKY_SECONDS.
+
+API_REPLICAS = {
+    "ALIASES": [],
+    "STICKY_SECONDS": int(os.environ.get("DATABASE_REPLICA_STICKY_SECONDS", "10")),
+    "COOKIE_NAME": "primary_until",
+    "APP_LABELS": ["market_app"],
+}
+
+for index, replica in enumerate(filter(None, os.environ.get("DATABASE_REPLICAS", "").split(",")), start=1):
+    alias = f"replica{index}"
+    location = "HOST" if DATABASE_ENGINE == "postgresql" else "NAME"
+    DATABASES[alias] = {**DATABASES["default"], location: replica.strip(), "TEST": {"MIRROR": "default"}}
+    API_REPLICAS["ALIASES"].append(alias)
+
+if API_REPLICAS["ALIASES"]:
+    DATABASE_ROUTERS = ["market_app.routers.ReplicaRouter"]
+    MIDDLEWARE.append("market_app.routers.ReplicaRoutingMiddleware")
+    API_MODE["MIDDLEWARE"].append("market_app.routers.ReplicaRoutingMiddleware")
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# Response-cache generations are bumped by every process that writes (API workers, run_workers, import_catalog),
+# so cached detail responses are only safe on a backend they all share. Set REDIS_URL to enable the response cache;
+# the per-process LocMemCache fallback never sees other processes' bumps, so the response cache stays off with it.
+
+REDIS_URL = os.environ.get("REDIS_URL", "")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "supermarket",
+        }
     }
+
+API_CACHE_ENABLED = bool(REDIS_URL)
+API_CACHE_TIMEOUT = 300
+
+# Keep per-market analytics (/api/markets/stats/) in the MarketStats table, refreshed on product/seller changes.
+# When disabled the endpoint aggregates on every request.
+
+MARKET_STATS_MATERIALIZED = os.environ.get("MARKET_STATS_MATERIALIZED", "true").lower() in ("1", "true", "yes")
+
+# Serve the default product and seller representations from pre-rendered ProductDocument/SellerDocument rows,
+# re-rendered whenever a product, its seller or one of their markets changes.
+
+READ_MODEL_ENABLED = os.environ.get("READ_MODEL_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# /api/changes/ keeps upsert and tombstone records for this long; compact_changes prunes older ones.
+
+CHANGE_FEED_RETENTION_DAYS = int(os.environ.get("CHANGE_FEED_RETENTION_DAYS", "30"))
+
+# run_workers claims a job for JOB_LEASE_SECONDS and renews the lease with every checkpoint it commits. A job whose
+# lease expires (its worker crashed) resumes from its last checkpoint, up to JOB_MAX_ATTEMPTS times, if its kind is
+# registered with retry=True; other kinds are marked failed instead of being run twice.
+
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+
+# The feed cursor is the change id, but concurrent PostgreSQL transactions can commit ids out of order. Records
+# younger than this are held back (along with everything after them) so a slow transaction cannot be skipped;
+# keep it above the longest write transaction. SQLite serializes writers, so it needs no window.
+
+CHANGE_FEED_SETTLE_SECONDS = int(
+    os.environ.get("CHANGE_FEED_SETTLE_SECONDS", "10" if DATABASE_ENGINE == "postgresql" else "0")
+)
+
+
+# Django REST framework
+# JSON goes through orjson when it is installed and falls back to the stdlib encoder otherwise
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "market_app.api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "market_app.api.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
+if API_MODE["ENABLED"]:
+    REST_FRAMEWORK.update(
+        {
+            "DEFAULT_RENDERER_CLASSES": ["market_app.api.renderers.ORJSONRenderer"],
+            "DEFAULT_AUTHENTICATION_CLASSES": ["rest_framework.authentication.BasicAuthentication"],
+            "DEFAULT_THROTTLE_CLASSES": [
+                "rest_framework.throttling.AnonRateThrottle",
+                "rest_framework.throttling.UserRateThrottle",
+            ],
+            "DEFAULT_THROTTLE_RATES": {
+                "anon": os.environ.get("API_THROTTLE_ANON", "600/minute"),
+                "user": os.environ.get("API_THROTTLE_USER", "3000/minute"),
+            },
+        }
+    )
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators